@@ -2,41 +2,65 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 from tkinter import font as tkFont
 import os
+import queue
 import threading
+from collections import deque
 from datetime import datetime
 import sys
 
 
-from file_handler import (
-    extract_text_from_file,
-    move_file_to_topic_folder,
-    scan_directory_for_files,
-    log_to_report,
-    remove_from_report_csv,
+from file_handler import setup_logging
+from llm_cache import get_cache_stats
+from llm_engine import warm_up
+from memory_store import search_files
+from metrics import (
+    diff_snapshots,
+    get_registry,
+    start_metrics_export,
+    summarize_metrics,
 )
-from llm_classifier import classify_with_llm
-from rule_based_classifier import classify_rule_based
-from extractor import (
-    extract_keywords_llm,
-    extract_keywords_tfidf,
-    summarize_llm,
-    summarize_rule_based,
-)
-from memory_store import store_file_metadata
+from pipeline import PipelineExecutor, delete_documents, load_pipeline_settings
+from scan_manifest import get_scan_manifest
+from session_log import SessionLog, prune_sessions
 from utils import is_supported_file
 import yaml
 
 # ------------------ Load Config ------------------
-try:
-    with open("config.yaml", "r") as f:
+
+USE_LLM = True
+EXTRACT_LLM_MODE = True
+PIPELINE_SETTINGS = None
+
+
+def load_app_config(path: str = "config.yaml"):
+    """Read config.yaml into the settings above (from main(), not on import)"""
+    global USE_LLM, EXTRACT_LLM_MODE, PIPELINE_SETTINGS
+
+    with open(path, "r") as f:
         config = yaml.safe_load(f)
 
     USE_LLM = config["classifier"]["use_llm_first"]
-    FALLBACK_ENABLED = config["classifier"]["fallback_to_rule"]
     EXTRACT_LLM_MODE = config["extractor"]["llm_mode"]
-except FileNotFoundError:
-    messagebox.showerror("Config Error", "config.yaml not found!")
-    sys.exit(1)
+    PIPELINE_SETTINGS = load_pipeline_settings(config)
+
+
+def describe_fallback(settings: dict) -> str:
+    """How the pipeline falls back to keyword rules, for the welcome text"""
+    if not settings:
+        return "Unknown"
+    cascade = settings["cascade"]
+    if cascade["enabled"] and "rules" in cascade["stages"]:
+        return "Rules first (cascade)"
+    if settings["use_llm"] and settings["fallback_to_rule"]:
+        return "Rules when the LLM answers Misc"
+    return "Disabled"
+
+
+SEARCH_PAGE_SIZE = 10
+UI_TICK_MS = 100  # How often queued worker updates are applied to the window
+UI_EVENTS_PER_TICK = 500  # Cap per tick so a burst never stalls the event loop
+RESULTS_MAX_LINES = 2000  # Older lines live only in the session log (📜 History)
+RESULTS_TRIM_SLACK = 200  # Trim in batches rather than on every message
 
 # ------------------ Enhanced GUI App ------------------
 
@@ -95,18 +119,32 @@ class ProgressFrame(tk.Frame):
         self.progress_bar.pack(fill="x", padx=20, pady=2)
 
     def update_progress(self, current, total, message="Processing..."):
+        self._stop_busy()
         progress = (current / total) * 100 if total > 0 else 0
         self.progress_bar["value"] = progress
         self.progress_var.set(f"{message} ({current}/{total})")
-        self.update_idletasks()
 
-    def reset(self):
+    def busy(self, message):
+        """Indeterminate progress for work of unknown length"""
+        self.progress_bar.config(mode="indeterminate")
+        self.progress_bar.start(15)
+        self.progress_var.set(message)
+
+    def _stop_busy(self):
+        if str(self.progress_bar["mode"]) == "indeterminate":
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate")
+
+    def reset(self, message="Ready to process files..."):
+        self._stop_busy()
         self.progress_bar["value"] = 0
-        self.progress_var.set("Ready to process files...")
+        self.progress_var.set(message)
 
 
 class StatsFrame(tk.Frame):
-    """Statistics display frame"""
+    """Statistics display frame, read from the metrics registry"""
+
+    REFRESH_MS = 1000
 
     def __init__(self, parent):
         super().__init__(parent, bg="white", relief="solid", bd=1)
@@ -135,12 +173,30 @@ class StatsFrame(tk.Frame):
         self.avg_time = self._create_stat_item(
             stats_container, "Avg Time/File", "0s", 2
         )
+        self.cache_rate = self._create_stat_item(
+            stats_container, "LLM Cache Hits", "0%", 3
+        )
+
+        # Where the time goes: parsing, inference, disk
+        self.parse_p95 = self._create_stat_item(
+            stats_container, "Parse p95", "0s", 0, row=1
+        )
+        self.inference_p95 = self._create_stat_item(
+            stats_container, "Inference p95", "0s", 1, row=1
+        )
+        self.disk_p95 = self._create_stat_item(
+            stats_container, "Disk p95", "0s", 2, row=1
+        )
+        self.tokens_per_sec = self._create_stat_item(
+            stats_container, "LLM Tokens/s", "0", 3, row=1
+        )
 
         self.reset_stats()
+        self.after(self.REFRESH_MS, self._refresh_periodically)
 
-    def _create_stat_item(self, parent, label, initial_value, column):
+    def _create_stat_item(self, parent, label, initial_value, column, row=0):
         frame = tk.Frame(parent, bg="white")
-        frame.grid(row=0, column=column, padx=10, pady=5, sticky="ew")
+        frame.grid(row=row, column=column, padx=10, pady=5, sticky="ew")
         parent.grid_columnconfigure(column, weight=1)
 
         value_label = tk.Label(
@@ -159,30 +215,344 @@ class StatsFrame(tk.Frame):
 
         return value_label
 
-    def update_stats(self, processed, successful, avg_time):
-        self.files_processed.config(text=str(processed))
-        success_rate = (successful / processed * 100) if processed > 0 else 0
-        self.success_rate.config(text=f"{success_rate:.1f}%")
-        self.avg_time.config(text=f"{avg_time:.1f}s")
+    def refresh(self):
+        """Show everything recorded since the last reset"""
+        summary = summarize_metrics(
+            diff_snapshots(get_registry().snapshot(), self._baseline)
+        )
+        stages = summary["stages"]
+        self.files_processed.config(text=str(summary["documents"]))
+        self.success_rate.config(text=f"{summary['success_rate'] * 100:.1f}%")
+        self.avg_time.config(text=f"{summary['avg_document_seconds']:.1f}s")
+        self.cache_rate.config(text=f"{summary['cache_hit_rate']:.0%}")
+        for label, stage in (
+            (self.parse_p95, "extract"),
+            (self.inference_p95, "analyze"),
+            (self.disk_p95, "write"),
+        ):
+            p95 = stages.get(stage, {}).get("p95", 0.0)
+            label.config(text=f"{p95:.2f}s")
+        self.tokens_per_sec.config(text=f"{summary['llm_tokens_per_sec']:.1f}")
+
+    def _refresh_periodically(self):
+        try:
+            self.refresh()
+        finally:
+            self.after(self.REFRESH_MS, self._refresh_periodically)
 
     def reset_stats(self):
-        self.files_processed.config(text="0")
-        self.success_rate.config(text="0%")
-        self.avg_time.config(text="0s")
+        self._baseline = get_registry().snapshot()
+        self.refresh()
+
+
+class FileQueue:
+    """
+    Files waiting to be processed, in the order they were added.
+
+    Duplicates are caught with a set lookup on the normalized path, so
+    adding a 100k-file folder stays linear, and rows can be read by index
+    for the virtualized list view.
+    """
+
+    def __init__(self):
+        self._paths = []
+        self._keys = set()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def add_many(self, paths) -> int:
+        """Append paths not already queued; returns how many were added"""
+        added = 0
+        for path in paths:
+            key = self._key(path)
+            if key not in self._keys:
+                self._keys.add(key)
+                self._paths.append(path)
+                added += 1
+        return added
+
+    def discard_many(self, paths):
+        removed = {self._key(path) for path in paths} & self._keys
+        if len(removed) == len(self._keys):
+            self.clear()
+        elif removed:
+            self._keys -= removed
+            self._paths = [p for p in self._paths if self._key(p) not in removed]
+
+    def clear(self):
+        self._paths.clear()
+        self._keys.clear()
+
+    def paths(self) -> list:
+        return list(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, path):
+        return self._key(path) in self._keys
+
+    def __getitem__(self, index):
+        return self._paths[index]
+
+
+class VirtualFileList(tk.Frame):
+    """
+    Listbox over a FileQueue that only holds the rows currently in view,
+    with its own scrollbar mapped onto the whole queue, so showing 100k
+    files costs the same as showing ten.
+    """
+
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, model, **listbox_options):
+        super().__init__(parent, bg="white")
+        self.model = model
+        self.top = 0  # Queue index of the first visible row
+
+        self.listbox = tk.Listbox(self, **listbox_options)
+        self.scrollbar = tk.Scrollbar(
+            self, orient="vertical", command=self._on_scrollbar
+        )
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        font = tkFont.Font(font=self.listbox["font"])
+        self._row_height = (
+            font.metrics("linespace") + 1 + 2 * int(self.listbox["selectborderwidth"])
+        )
+
+        self.listbox.bind("<Configure>", lambda e: self.refresh())
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-self.WHEEL_ROWS))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(self.WHEEL_ROWS))
+
+    def visible_rows(self):
+        border = 2 * (
+            int(self.listbox["borderwidth"]) + int(self.listbox["highlightthickness"])
+        )
+        return max(1, (self.listbox.winfo_height() - border) // self._row_height)
+
+    def refresh(self):
+        """Redraw the rows in view; call after the queue changes"""
+        total = len(self.model)
+        rows = self.visible_rows()
+        self.top = max(0, min(self.top, total - rows))
+
+        self.listbox.delete(0, "end")
+        window = self.model[self.top : self.top + rows]
+        if window:
+            self.listbox.insert("end", *(os.path.basename(p) for p in window))
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows):
+        self.top += rows
+        self.refresh()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top = int(float(amount) * len(self.model))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.top += int(amount) * step
+        self.refresh()
+
+    def _on_wheel(self, event):
+        return self.scroll(-self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS)
+
+
+class UIEventQueue:
+    """
+    Updates posted by worker threads and applied by the Tk thread on a
+    fixed tick. Posting never blocks the worker; of the "coalesced" kinds
+    (e.g. progress) only the latest event per tick is applied.
+    """
+
+    def __init__(self, coalesce=("progress",)):
+        self._queue = queue.SimpleQueue()
+        self.coalesce = set(coalesce)
+
+    def post(self, kind, *args):
+        self._queue.put((kind, args))
+
+    def drain(self, limit):
+        events = []
+        latest = {}
+        kept = 0
+        while kept < limit:
+            try:
+                kind, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind in latest:
+                events[latest[kind]] = None  # Superseded
+            else:
+                kept += 1
+            if kind in self.coalesce:
+                latest[kind] = len(events)
+            events.append((kind, args))
+        return [event for event in events if event is not None]
+
+
+class SessionLogWindow(tk.Toplevel):
+    """
+    Browse the on-disk session log one page at a time, or search it.
+    Only the page being shown is held in the widget.
+    """
+
+    TAG_COLORS = {
+        "success": "#28a745",
+        "error": "#dc3545",
+        "info": "#17a2b8",
+        "warning": "#ffc107",
+        "header": "#2c3e50",
+    }
+
+    def __init__(self, parent, session_log):
+        super().__init__(parent)
+        self.session_log = session_log
+        self.page_number = 0
+        self.title("InsightSort - Session Log")
+        self.geometry("900x600")
+        self.configure(bg="white")
+
+        controls = tk.Frame(self, bg="white")
+        controls.pack(fill="x", padx=10, pady=10)
+
+        for text, command in (
+            ("⏮ Oldest", lambda: self.show_page(0)),
+            ("◀ Older", lambda: self.show_page(self.page_number - 1)),
+            ("Newer ▶", lambda: self.show_page(self.page_number + 1)),
+            ("Latest ⏭", lambda: self.show_page(self.session_log.page_count - 1)),
+        ):
+            tk.Button(
+                controls,
+                text=text,
+                command=command,
+                bg="#6c757d",
+                fg="white",
+                relief="flat",
+                bd=0,
+                padx=10,
+                pady=5,
+                cursor="hand2",
+                font=("Segoe UI", 8),
+            ).pack(side="left", padx=(0, 5))
+
+        self.page_label = tk.Label(
+            controls, bg="white", fg="#6c757d", font=("Segoe UI", 9)
+        )
+        self.page_label.pack(side="left", padx=10)
+
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(
+            controls,
+            textvariable=self.search_var,
+            relief="solid",
+            bd=1,
+            font=("Segoe UI", 9),
+            width=24,
+        )
+        search_entry.pack(side="right", ipady=3)
+        search_entry.bind("<Return>", lambda e: self.search())
+
+        self.text = scrolledtext.ScrolledText(
+            self,
+            wrap=tk.WORD,
+            bg="#f8f9fa",
+            fg="#495057",
+            font=("Consolas", 10),
+            relief="solid",
+            bd=1,
+            padx=10,
+            pady=10,
+        )
+        self.text.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        for tag, color in self.TAG_COLORS.items():
+            self.text.tag_configure(tag, foreground=color)
+
+        self.show_page(self.session_log.page_count - 1)
+
+    def _show_entries(self, entries):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        for entry in entries:
+            self.text.insert(
+                "end", f"[{entry['time']}] {entry['message']}\n", entry["tag"]
+            )
+        self.text.configure(state="disabled")
+
+    def show_page(self, number):
+        pages = self.session_log.page_count
+        if pages == 0:
+            self.page_label.config(text="Session log is empty")
+            return
+        self.page_number = max(0, min(number, pages - 1))
+        self._show_entries(self.session_log.page(self.page_number))
+        self.page_label.config(
+            text=f"Page {self.page_number + 1} of {pages} "
+            f"({len(self.session_log)} entries)"
+        )
+        self.text.see("end")
+
+    def search(self):
+        query = self.search_var.get().strip()
+        if not query:
+            self.show_page(self.page_number)
+            return
+        matches = self.session_log.search(query, limit=self.session_log.page_size)
+        self._show_entries(matches)
+        self.page_label.config(
+            text=(
+                f"{len(matches)} latest matches for '{query}'"
+                if matches
+                else f"No entries match '{query}'"
+            )
+        )
 
 
 class InsightSortApp:
     def __init__(self, master):
         self.master = master
-        self.setup_window()
-        self.setup_styles()
-        self.create_widgets()
 
         # Data
-        self.files = []
+        self.file_queue = FileQueue()
         self.processing = False
         self.stats = {"processed": 0, "successful": 0, "total_time": 0}
 
+        # Worker threads post here; applied on the Tk thread every tick
+        self.ui_events = UIEventQueue()
+        self.ui_handlers = {
+            "log": self.log_message,
+            "progress": self.update_progress,
+            "result": self.show_result,
+            "summary": self.display_final_summary,
+            "done": self.finish_processing,
+            "folder_scanned": self.on_folder_scanned,
+            "model_loaded": self.on_model_loaded,
+        }
+        self._scroll_pending = False
+
+        # The results pane keeps only recent lines; everything logged is
+        # also appended to the on-disk session log for paging/search
+        prune_sessions()
+        self.session_log = SessionLog()
+        self._pane_entries = deque()  # Line count of each entry in the pane
+        self._pane_lines = 0
+        self.history_window = None
+
+        self.setup_window()
+        self.setup_styles()
+        self.create_widgets()
+        self.master.after(UI_TICK_MS, self.drain_ui_events)
+
     def setup_window(self):
         """Configure main window"""
         self.master.title("InsightSort - Intelligent Document Classifier")
@@ -313,12 +683,10 @@ class InsightSortApp:
             font=("Segoe UI", 10, "bold"),
         ).pack(anchor="w", pady=(0, 5))
 
-        # Files listbox with scrollbar
-        listbox_frame = tk.Frame(list_frame, bg="white")
-        listbox_frame.pack(fill="both", expand=True)
-
-        self.files_listbox = tk.Listbox(
-            listbox_frame,
+        # Files list with scrollbar; only the visible rows exist as widgets
+        self.files_view = VirtualFileList(
+            list_frame,
+            self.file_queue,
             height=8,
             bg="#f8f9fa",
             fg="#495057",
@@ -327,13 +695,7 @@ class InsightSortApp:
             bd=1,
             selectmode="extended",
         )
-
-        scrollbar = tk.Scrollbar(listbox_frame, orient="vertical")
-        self.files_listbox.config(yscrollcommand=scrollbar.set)
-        scrollbar.config(command=self.files_listbox.yview)
-
-        self.files_listbox.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.files_view.pack(fill="both", expand=True)
 
         # File count
         self.file_count_var = tk.StringVar(value="0 files selected")
@@ -431,6 +793,52 @@ class InsightSortApp:
         )
         clear_results_btn.pack(side="right")
 
+        # Full session log, including entries trimmed from the pane
+        history_btn = tk.Button(
+            results_header,
+            text="📜 History",
+            command=self.show_history,
+            bg="#6c757d",
+            fg="white",
+            relief="flat",
+            bd=0,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            font=("Segoe UI", 8),
+        )
+        history_btn.pack(side="right", padx=(0, 8))
+
+        # Search box (Enter again on the same query shows the next page)
+        search_btn = tk.Button(
+            results_header,
+            text="🔍 Search",
+            command=self.search_documents,
+            bg="#4A90E2",
+            fg="white",
+            relief="flat",
+            bd=0,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            font=("Segoe UI", 8),
+        )
+        search_btn.pack(side="right", padx=(0, 8))
+
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(
+            results_header,
+            textvariable=self.search_var,
+            relief="solid",
+            bd=1,
+            font=("Segoe UI", 9),
+            width=24,
+        )
+        search_entry.pack(side="right", padx=(0, 5), ipady=3)
+        search_entry.bind("<Return>", lambda e: self.search_documents())
+        self.search_query = None
+        self.search_page = 0
+
         # Progress section
         self.progress_frame = ProgressFrame(parent)
         self.progress_frame.pack(fill="x", padx=20, pady=(0, 10))
@@ -483,7 +891,7 @@ Welcome to InsightSort - Your Intelligent Document Classifier!
 
 🔧 Current Configuration:
    • Classification: {"AI-Powered (LLM)" if USE_LLM else "Rule-based"}
-   • Fallback: {"Enabled" if FALLBACK_ENABLED else "Disabled"}
+   • Fallback: {describe_fallback(PIPELINE_SETTINGS)}
    • Extraction: {"AI-Powered (LLM)" if EXTRACT_LLM_MODE else "Traditional (TF-IDF)"}
 
 📋 How to get started:
@@ -500,6 +908,7 @@ Ready to organize your documents intelligently? Let's begin! 🚀
         self.result_text.insert("1.0", welcome_text)
         self.result_text.tag_add("header", "2.0", "2.end")
         self.result_text.tag_add("info", "4.0", "10.end")
+        self._track_pane_lines(welcome_text.count("\n"))
 
     def upload_files(self):
         """Handle file upload"""
@@ -515,14 +924,9 @@ Ready to organize your documents intelligently? Let's begin! 🚀
             title="Select Files to Process", filetypes=filetypes
         )
 
-        added_count = 0
-        for file_path in selected:
-            if is_supported_file(file_path) and file_path not in self.files:
-                self.files.append(file_path)
-                self.files_listbox.insert("end", os.path.basename(file_path))
-                added_count += 1
-
-        self.update_file_count()
+        added_count = self.add_files(
+            [file_path for file_path in selected if is_supported_file(file_path)]
+        )
 
         if added_count > 0:
             self.log_message(
@@ -538,42 +942,55 @@ Ready to organize your documents intelligently? Let's begin! 🚀
             return
 
         self.log_message(f"🔍 Scanning folder: {folder}", "info")
-        scanned = scan_directory_for_files(folder)
+        threading.Thread(target=self.scan_folder, args=(folder,), daemon=True).start()
 
-        added_count = 0
-        for file_path in scanned:
-            if file_path not in self.files:
-                self.files.append(file_path)
-                self.files_listbox.insert("end", os.path.basename(file_path))
-                added_count += 1
+    def scan_folder(self, folder):
+        """Worker thread: find files that are new or changed since last processed"""
+        try:
+            scanned = get_scan_manifest().scan([folder])
+        except Exception as e:
+            self.ui_events.post("log", f"❌ Error scanning folder: {e}", "error")
+            return
+        self.ui_events.post("folder_scanned", scanned)
 
-        self.update_file_count()
-        self.log_message(f"✅ Added {added_count} file(s) from folder scan", "success")
+    def on_folder_scanned(self, scanned):
+        added_count = self.add_files(scanned)
+        self.log_message(
+            f"✅ Added {added_count} new or changed file(s) from folder scan", "success"
+        )
+
+    def add_files(self, paths):
+        """Queue files (skipping ones already queued) and refresh the list"""
+        added_count = self.file_queue.add_many(paths)
+        if added_count:
+            self.files_view.refresh()
+            self.update_file_count()
+        return added_count
 
     def clear_files(self):
         """Clear file list"""
-        if not self.files:
+        if not self.file_queue:
             return
 
         result = messagebox.askyesno(
             "Clear Files",
-            f"Are you sure you want to clear all {len(self.files)} selected files?",
+            f"Are you sure you want to clear all {len(self.file_queue)} selected files?",
         )
 
         if result:
-            self.files.clear()
-            self.files_listbox.delete(0, "end")
+            self.file_queue.clear()
+            self.files_view.refresh()
             self.update_file_count()
             self.log_message("🧹 File list cleared", "info")
 
     def update_file_count(self):
         """Update file count display"""
-        count = len(self.files)
+        count = len(self.file_queue)
         self.file_count_var.set(f"{count} file{'s' if count != 1 else ''} selected")
 
     def start_processing(self):
         """Start file processing in separate thread"""
-        if not self.files:
+        if not self.file_queue:
             messagebox.showwarning("No Files", "Please add files to process first.")
             return
 
@@ -585,7 +1002,9 @@ Ready to organize your documents intelligently? Let's begin! 🚀
         self.set_processing_state(True)
 
         # Start processing in separate thread
-        processing_thread = threading.Thread(target=self.process_files)
+        processing_thread = threading.Thread(
+            target=self.process_files, args=(self.file_queue.paths(),)
+        )
         processing_thread.daemon = True
         processing_thread.start()
 
@@ -605,122 +1024,109 @@ Ready to organize your documents intelligently? Let's begin! 🚀
         else:
             self.process_btn.config(text="⚡ Analyze & Organize")
 
-    def process_files(self):
-        """Process all files with progress tracking"""
+    def process_files(self, files):
+        """Worker thread: process files, posting UI updates without waiting on Tk"""
         start_time = datetime.now()
-        total_files = len(self.files)
+        total_files = len(files)
         successful = 0
+        post = self.ui_events.post
 
         try:
-            self.log_message(
-                f"\n🚀 Starting batch processing of {total_files} files...", "header"
+            post(
+                "log",
+                f"\n🚀 Starting batch processing of {total_files} files...",
+                "header",
             )
-            self.log_message(
-                f"📅 Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}", "info"
+            post(
+                "log",
+                f"📅 Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}",
+                "info",
             )
 
-            for i, file_path in enumerate(self.files, 1):
-                file_start_time = datetime.now()
-
-                try:
-                    # Update progress
-                    self.master.after(
-                        0,
-                        lambda: self.progress_frame.update_progress(
-                            i - 1,
-                            total_files,
-                            f"Processing {os.path.basename(file_path)}",
-                        ),
-                    )
-
-                    self.master.after(
-                        0,
-                        lambda fp=file_path: self.log_message(
-                            f"\n📄 [{i}/{total_files}] Processing: {os.path.basename(fp)}",
-                            "info",
-                        ),
-                    )
-
-                    # Step 1: Extract text
-                    text = extract_text_from_file(file_path)
-
-                    # Step 2: Classify
-                    topic = None
-                    if USE_LLM:
-                        topic = classify_with_llm(text)
-                        if topic == "Misc" and FALLBACK_ENABLED:
-                            topic = classify_rule_based(text)
-                    else:
-                        topic = classify_rule_based(text)
-
-                    # Step 3: Extract keywords and summary
-                    if EXTRACT_LLM_MODE:
-                        keywords = extract_keywords_llm(text)
-                        summary = summarize_llm(text)
-                    else:
-                        keywords = extract_keywords_tfidf(text)
-                        summary = summarize_rule_based(text)
-
-                    # Step 4: Organize file
-                    move_file_to_topic_folder(file_path, topic)
-
-                    # Step 5: Store + log
-                    store_file_metadata(
-                        os.path.basename(file_path), topic, keywords, summary
-                    )
-                    log_to_report(file_path, topic, keywords, summary)
-
-                    # Calculate processing time
-                    processing_time = (datetime.now() - file_start_time).total_seconds()
-
-                    # Step 6: Show results
-                    self.master.after(
-                        0,
-                        lambda t=topic, k=keywords, s=summary, pt=processing_time: self.display_file_results(
-                            t, k, s, pt
-                        ),
-                    )
+            # Steps 1-5 run as a staged pipeline: extract -> LLM -> write
+            executor = PipelineExecutor(PIPELINE_SETTINGS)
+            processed = []
 
+            for i, result in enumerate(executor.run(files), 1):
+                if "warning" not in result:
+                    processed.append((result["file"], result["status"]))
+                if result["status"] == "ok":
                     successful += 1
 
-                except Exception as e:
-                    self.master.after(
-                        0,
-                        lambda fp=file_path, err=str(e): self.log_message(
-                            f"❌ Error processing {os.path.basename(fp)}: {err}",
-                            "error",
-                        ),
-                    )
-
-                # Update progress
-                self.master.after(
-                    0,
-                    lambda: self.progress_frame.update_progress(
-                        i, total_files, "Processing complete"
-                    ),
-                )
+                # Step 6: Show results
+                post("result", i, total_files, result)
+                post("progress", i, total_files, "Processing")
+
+            # Later folder scans skip these unless they change
+            get_scan_manifest().mark_processed(processed)
 
             # Final summary
             end_time = datetime.now()
             total_time = (end_time - start_time).total_seconds()
             avg_time = total_time / total_files if total_files > 0 else 0
 
-            self.master.after(
-                0,
-                lambda: self.display_final_summary(
-                    total_files, successful, total_time, avg_time
-                ),
+            post(
+                "summary",
+                total_files,
+                successful,
+                total_time,
+                avg_time,
+                executor.stats(),
             )
 
         finally:
-            # Reset UI state
-            self.master.after(0, lambda: self.set_processing_state(False))
-            self.master.after(0, lambda: self.files.clear())
-            self.master.after(0, lambda: self.files_listbox.delete(0, "end"))
-            self.master.after(0, lambda: self.update_file_count())
-            self.master.after(0, lambda: self.progress_frame.reset())
-
-    def display_file_results(self, topic, keywords, summary, processing_time):
+            post("done", files)
+
+    def drain_ui_events(self):
+        """Apply queued worker updates on the Tk thread, then reschedule"""
+        try:
+            for kind, args in self.ui_events.drain(UI_EVENTS_PER_TICK):
+                self.ui_handlers[kind](*args)
+            if self._scroll_pending:
+                self.result_text.see("end")
+                self._scroll_pending = False
+        finally:
+            self.master.after(UI_TICK_MS, self.drain_ui_events)
+
+    def update_progress(self, current, total, message):
+        self.progress_frame.update_progress(current, total, message)
+
+    def show_result(self, n, total, result):
+        self.log_message(f"\n📄 [{n}/{total}] Processed: {result['filename']}", "info")
+        if result["status"] == "ok":
+            self.display_file_results(
+                result["topic"],
+                result["keywords"],
+                result["summary"],
+                result["elapsed"],
+                result["kv_stats"],
+                result.get("duplicate_of"),
+            )
+            if "warning" in result:
+                self.log_message(f"   ⚠️ {result['warning']}", "error")
+        else:
+            self.log_message(
+                f"❌ Error processing {result['filename']}: {result['error']}",
+                "error",
+            )
+
+    def finish_processing(self, files):
+        """Reset UI state and drop the processed files from the queue"""
+        self.set_processing_state(False)
+        self.file_queue.discard_many(files)
+        self.files_view.refresh()
+        self.update_file_count()
+        self.progress_frame.reset()
+
+    def display_file_results(
+        self,
+        topic,
+        keywords,
+        summary,
+        processing_time,
+        kv_stats=None,
+        duplicate_of=None,
+    ):
         """Display results for a single file"""
         self.log_message(f"   ✅ Topic: {topic}", "success")
         self.log_message(
@@ -731,11 +1137,38 @@ Ready to organize your documents intelligently? Let's begin! 🚀
             "info",
         )
         self.log_message(f"   ⏱️  Processing time: {processing_time:.2f}s", "info")
+        if duplicate_of:
+            self.log_message(
+                f"   ♻️ Reused results of near-duplicate {duplicate_of['filename']} "
+                f"({duplicate_of['similarity']:.0%} similar)",
+                "info",
+            )
+        if kv_stats:
+            self.log_message(
+                f"   🧮 Tokens evaluated: {kv_stats['evaluated_tokens']} "
+                f"({kv_stats['hit_rate']:.0%} KV cache hit rate)",
+                "info",
+            )
         self.log_message("   " + "─" * 50, "info")
 
-    def display_final_summary(self, total, successful, total_time, avg_time):
+    def display_final_summary(
+        self, total, successful, total_time, avg_time, pipeline_stats=None
+    ):
         """Display final processing summary"""
         success_rate = (successful / total * 100) if total > 0 else 0
+        cache_stats = get_cache_stats()
+        stage_lines = ""
+        if pipeline_stats:
+            stage_lines = "".join(
+                f"\n   • Stage {name}: {stage['throughput']:.2f} docs/s, "
+                f"{stage['utilization']:.0%} busy"
+                for name, stage in pipeline_stats["stages"].items()
+            )
+            stage_lines += "".join(
+                f"\n   • Cascade {name}: {counts['accepted']}/{counts['calls']} answered, "
+                f"{counts['escalation_rate']:.0%} escalated"
+                for name, counts in pipeline_stats.get("cascade", {}).items()
+            )
 
         summary_text = f"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -749,6 +1182,7 @@ Ready to organize your documents intelligently? Let's begin! 🚀
    • Success Rate: {success_rate:.1f}%
    • Total Time: {total_time:.2f} seconds
    • Average Time per File: {avg_time:.2f} seconds
+   • LLM Cache: {cache_stats["hits"]} hits / {cache_stats["misses"]} misses ({cache_stats["hit_rate"]:.0%}){stage_lines}
 
 All files have been organized into topic folders! 🎯
         """
@@ -756,7 +1190,28 @@ All files have been organized into topic folders! 🎯
         self.log_message(summary_text, "header")
 
         # Update stats display
-        self.stats_frame.update_stats(total, successful, avg_time)
+        self.stats_frame.refresh()
+
+    def warm_up_model(self):
+        """Load the LLM in the background so the window opens right away"""
+        self.progress_frame.busy("⏳ Loading language model...")
+        warm_up(
+            lambda error, seconds: self.ui_events.post("model_loaded", error, seconds)
+        )
+
+    def on_model_loaded(self, error, seconds):
+        if error is None:
+            self.log_message(f"🤖 Language model loaded in {seconds:.1f}s", "success")
+            status = "Ready to process files..."
+        else:
+            self.log_message(
+                f"⚠️ Language model unavailable ({error}); "
+                "rule-based fallback will be used",
+                "error",
+            )
+            status = "Ready (rule-based mode)..."
+        if not self.processing:
+            self.progress_frame.reset(status)
 
     def delete_from_output(self):
         """Delete files from output directory"""
@@ -765,41 +1220,92 @@ All files have been organized into topic folders! 🎯
             messagebox.showwarning("No Output", "No organized files found to delete.")
             return
 
-        choice = filedialog.askopenfilename(
-            initialdir=output_dir, title="Select File to Delete"
+        whole_folder = messagebox.askyesnocancel(
+            "Delete", "Delete a whole topic folder?\n\nChoose No to pick a single file."
         )
+        if whole_folder is None:
+            return
+
+        if whole_folder:
+            choice = filedialog.askdirectory(
+                initialdir=output_dir, title="Select Topic Folder to Delete"
+            )
+        else:
+            choice = filedialog.askopenfilename(
+                initialdir=output_dir, title="Select File to Delete"
+            )
 
         if not choice:
             return
 
         try:
-            from memory_store import delete_file_metadata
-            from file_handler import remove_from_report_csv  # 👈
+            if os.path.isdir(choice):
+                paths = [entry.path for entry in os.scandir(choice) if entry.is_file()]
+                label = f"{len(paths)} files from {os.path.basename(choice)}"
+                parent = choice
+            elif os.path.isfile(choice):
+                paths = [choice]
+                label = os.path.basename(choice)
+                parent = os.path.dirname(choice)
+            else:
+                return
 
-            if os.path.isfile(choice):
-                filename = os.path.basename(choice)
-                os.remove(choice)
-                delete_file_metadata(filename)
-                remove_from_report_csv(filename)  # 👈
+            delete_documents(paths)
 
-                # Clean up empty folder
-                parent = os.path.dirname(choice)
-                try:
-                    if len(os.listdir(parent)) == 0:
-                        os.rmdir(parent)
-                except:
-                    pass
+            # Clean up empty folder
+            try:
+                if len(os.listdir(parent)) == 0:
+                    os.rmdir(parent)
+            except:
+                pass
 
-                self.log_message(f"🗑️ Deleted file: {filename}", "warning")
-                messagebox.showinfo("Deleted", f"Successfully deleted: {filename}")
+            self.log_message(f"🗑️ Deleted: {label}", "warning")
+            messagebox.showinfo("Deleted", f"Successfully deleted: {label}")
 
         except Exception as e:
             self.log_message(f"❌ Error deleting file: {e}", "error")
             messagebox.showerror("Error", f"Failed to delete file: {e}")
 
+    def search_documents(self):
+        """Show a page of full-text search results for the search box"""
+        query = self.search_var.get().strip()
+        if not query:
+            return
+
+        # Repeating the same search pages through the results
+        if query == self.search_query:
+            self.search_page += 1
+        else:
+            self.search_query = query
+            self.search_page = 0
+
+        offset = self.search_page * SEARCH_PAGE_SIZE
+        results = search_files(query, limit=SEARCH_PAGE_SIZE, offset=offset)
+        if not results:
+            if self.search_page == 0:
+                self.log_message(f"\n🔍 No documents match '{query}'", "warning")
+            else:
+                self.log_message(f"\n🔍 No more results for '{query}'", "warning")
+            self.search_query = None
+            return
+
+        self.log_message(
+            f"\n🔍 Results {offset + 1}-{offset + len(results)} for '{query}'",
+            "header",
+        )
+        for result in results:
+            self.log_message(
+                f"   📄 {result['filename']} ({result['topic']})", "success"
+            )
+            self.log_message(f"      {result['snippet']}", "info")
+        if len(results) == SEARCH_PAGE_SIZE:
+            self.log_message("   Press Enter again for more results", "info")
+
     def clear_results(self):
         """Clear results text area"""
         self.result_text.delete("1.0", "end")
+        self._pane_entries.clear()
+        self._pane_lines = 0
         self.show_welcome_message()
         self.stats_frame.reset_stats()
 
@@ -815,9 +1321,33 @@ All files have been organized into topic folders! 🎯
         end_line = self.result_text.index("end-1c")
         self.result_text.tag_add(tag, start_line, end_line)
 
-        # Auto-scroll to bottom
-        self.result_text.see("end")
-        self.result_text.update_idletasks()
+        self.session_log.append(tag, message, timestamp)
+        self._track_pane_lines(message.count("\n") + 1)
+
+        # Auto-scroll to bottom, once per UI tick rather than per message
+        self._scroll_pending = True
+
+    def _track_pane_lines(self, lines):
+        """Record a new entry; drop the oldest whole entries once over the cap"""
+        self._pane_entries.append(lines)
+        self._pane_lines += lines
+        if self._pane_lines <= RESULTS_MAX_LINES + RESULTS_TRIM_SLACK:
+            return
+
+        # Deleting the text also removes its tag ranges
+        trimmed = 0
+        while self._pane_lines - trimmed > RESULTS_MAX_LINES:
+            trimmed += self._pane_entries.popleft()
+        self.result_text.delete("1.0", f"{trimmed + 1}.0")
+        self._pane_lines -= trimmed
+
+    def show_history(self):
+        """Open (or raise) the session log browser"""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.show_page(self.session_log.page_count - 1)
+            self.history_window.lift()
+            return
+        self.history_window = SessionLogWindow(self.master, self.session_log)
 
 
 # ------------------ Application Entry Point ------------------
@@ -825,17 +1355,26 @@ All files have been organized into topic folders! 🎯
 
 def main():
     """Main application entry point with error handling"""
+    try:
+        load_app_config()
+    except FileNotFoundError:
+        messagebox.showerror("Config Error", "config.yaml not found!")
+        sys.exit(1)
+    setup_logging()
+
     try:
         root = tk.Tk()
 
         # Handle window closing
         def on_closing():
             if messagebox.askokcancel("Quit", "Do you want to quit InsightSort?"):
+                app.session_log.close()
                 root.destroy()
 
         root.protocol("WM_DELETE_WINDOW", on_closing)
 
         # Create and run app
+        start_metrics_export()
         app = InsightSortApp(root)
 
         # Add keyboard shortcuts
@@ -850,6 +1389,9 @@ def main():
             "InsightSort - Intelligent Document Classifier (Ctrl+O: Files, Ctrl+F: Folder, F5: Process)"
         )
 
+        if USE_LLM or EXTRACT_LLM_MODE:
+            root.after_idle(app.warm_up_model)
+
         root.mainloop()
 
     except Exception as e:
@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for InsightSort: synthetic corpora, a stub LLM and a
+per-stage timing runner. Run with `python -m benchmark`.
+"""
@@ -0,0 +1,103 @@
+"""
+    python -m benchmark [--docs N] [--pages MIN MAX] [--formats pdf docx txt]
+                        [--mode llm|rules] [--out results.json]
+                        [--baseline baseline.json] [--save-baseline]
+
+Prints the results JSON to stdout (and --out). Exits 1 when a stage
+regressed against --baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmark.runner import (
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark", description="Benchmark InsightSort stages."
+    )
+    parser.add_argument("--docs", type=int, default=100, help="Documents to generate")
+    parser.add_argument(
+        "--pages", type=int, nargs=2, default=[1, 5], metavar=("MIN", "MAX")
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["pdf", "docx", "txt"],
+        default=["pdf", "docx", "txt"],
+    )
+    parser.add_argument("--mode", choices=["llm", "rules"], default="llm")
+    parser.add_argument(
+        "--duplicates",
+        type=float,
+        default=0.0,
+        help="Share of near-duplicate documents",
+    )
+    parser.add_argument(
+        "--prompt-token-ms",
+        type=float,
+        default=0.2,
+        help="Stub LLM cost per prompt token",
+    )
+    parser.add_argument(
+        "--token-ms", type=float, default=20.0, help="Stub LLM cost per generated token"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Scratch directory (default: a new temp dir)")
+    parser.add_argument("--out", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write the results to --baseline"
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs --baseline PATH to write to")
+    results = run_benchmark(
+        n_docs=args.docs,
+        formats=tuple(args.formats),
+        min_pages=args.pages[0],
+        max_pages=args.pages[1],
+        mode=args.mode,
+        duplicate_rate=args.duplicates,
+        prompt_token_seconds=args.prompt_token_ms / 1000,
+        token_seconds=args.token_ms / 1000,
+        seed=args.seed,
+        workdir=args.workdir,
+    )
+    print(json.dumps(results, indent=2))
+    if args.out:
+        save_results(results, args.out)
+
+    if not args.baseline:
+        return 0
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"[Bench] Saved baseline: {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressions = compare_to_baseline(
+        results, load_results(args.baseline), args.tolerance
+    )
+    for message in regressions:
+        print(f"[Bench] Regression: {message}", file=sys.stderr)
+    if not regressions:
+        print("[Bench] No regressions against baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
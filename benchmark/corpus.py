@@ -0,0 +1,149 @@
+"""
+Synthetic PDF / DOCX / TXT corpora for benchmarks.
+
+Documents are built from each topic's rule keywords mixed with filler
+words, so the rule-based classifier has something to find, and a share of
+them can be near-duplicates of earlier ones (revised versions).
+"""
+
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from rule_based_classifier import TOPIC_KEYWORDS
+
+FILLER = (
+    "the of and to in for on with as by at from this that report review "
+    "section update plan result team project period data overview item "
+    "process value change note status total current previous next"
+).split()
+
+WORDS_PER_PAGE = 350
+
+# ------------------ Text ------------------
+
+
+def page_text(rng: random.Random, topic: str, words: int = WORDS_PER_PAGE) -> str:
+    keywords = TOPIC_KEYWORDS.get(topic) or ["misc"]
+    sentences = []
+    count = 0
+    while count < words:
+        length = rng.randint(8, 18)
+        sentence = [
+            rng.choice(keywords) if rng.random() < 0.15 else rng.choice(FILLER)
+            for _ in range(length)
+        ]
+        sentences.append(" ".join(sentence).capitalize() + ".")
+        count += length
+    return " ".join(sentences)
+
+
+def revise(rng: random.Random, pages: list, edits: int = 3) -> list:
+    """
+    A near-duplicate: the same pages with a few words changed.
+    """
+    pages = list(pages)
+    for _ in range(edits):
+        i = rng.randrange(len(pages))
+        words = pages[i].split()
+        words[rng.randrange(len(words))] = rng.choice(FILLER)
+        pages[i] = " ".join(words)
+    return pages
+
+
+# ------------------ Writers ------------------
+
+
+def write_txt(path: str, pages: list):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(pages))
+
+
+def write_pdf(path: str, pages: list):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (50, 50, -50, -50), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    "</Relationships>"
+)
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def write_docx(path: str, pages: list):
+    """
+    Minimal WordprocessingML package; one paragraph per page with page breaks.
+    """
+    body = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'.join(
+        f"<w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p>" for text in pages
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{_W}"><w:body>{body}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        docx.writestr("_rels/.rels", _RELS)
+        docx.writestr("word/document.xml", document)
+
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "txt": write_txt}
+
+# ------------------ Corpus ------------------
+
+
+def generate_corpus(
+    out_dir: str,
+    n_docs: int = 100,
+    formats: tuple = ("pdf", "docx", "txt"),
+    min_pages: int = 1,
+    max_pages: int = 5,
+    duplicate_rate: float = 0.0,
+    seed: int = 0,
+) -> list:
+    """
+    Write `n_docs` documents to `out_dir` and return their paths.
+
+    Formats are cycled; page counts are drawn uniformly from
+    [min_pages, max_pages]. Each document has a `duplicate_rate` chance of
+    being a lightly revised copy of an earlier one.
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    topics = list(TOPIC_KEYWORDS)
+    paths = []
+    written = []
+    for i in range(n_docs):
+        if written and rng.random() < duplicate_rate:
+            topic, pages = rng.choice(written)
+            pages = revise(rng, pages)
+        else:
+            topic = topics[i % len(topics)]
+            pages = [
+                page_text(rng, topic) for _ in range(rng.randint(min_pages, max_pages))
+            ]
+            written.append((topic, pages))
+
+        fmt = formats[i % len(formats)]
+        path = os.path.join(out_dir, f"doc_{i:05d}_{topic.lower()}.{fmt}")
+        WRITERS[fmt](path, pages)
+        paths.append(path)
+    return paths
@@ -0,0 +1,324 @@
+"""
+Time each InsightSort stage over a synthetic corpus.
+
+The runner works in a scratch directory (output/, logs/ and the memory DB
+are created there) against a generated config, with StubLlama standing in
+for the model, so results depend only on the code and the latency model.
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import yaml
+
+from benchmark.corpus import generate_corpus
+from benchmark.startup import measure_startup
+from benchmark.stub_llm import StubLlama
+
+STAGES = ["extract", "classify", "keywords", "summary", "move", "store", "report"]
+DEFAULT_TOLERANCE = 0.2  # Allowed slowdown vs. the baseline before failing
+MIN_COMPARE_MS = 1.0  # Stages with a p95 below this are timer noise; not compared
+
+# ------------------ Setup ------------------
+
+
+def bench_config(mode: str, dedupe: bool) -> dict:
+    """
+    Config for a benchmark run: the LLM result cache is off so every
+    document really reaches the (stub) model.
+    """
+    llm = mode == "llm"
+    return {
+        "cache": {"enabled": False},
+        "classifier": {
+            "use_llm_first": llm,
+            "fallback_to_rule": True,
+            "embedding": False,
+            "cascade": {"enabled": False},
+        },
+        "extractor": {
+            "llm_mode": llm,
+            "fused_analysis": llm,
+            "word_budget": 2000,
+            "sample_pages": 2,
+        },
+        "pipeline": {"extract_workers": 4, "queue_size": 8},
+        "dedupe": {"enabled": dedupe},
+    }
+
+
+def _install_stub(llm: StubLlama):
+    from llm_engine import set_embedder, set_llm
+
+    set_llm(llm)
+    set_embedder(llm)
+
+
+# ------------------ Statistics ------------------
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize_times(times: list) -> dict:
+    total = sum(times)
+    return {
+        "count": len(times),
+        "total_seconds": round(total, 6),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3) if times else 0.0,
+        "p50_ms": round(percentile(times, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(times, 0.95) * 1000, 3),
+        "docs_per_sec": round(len(times) / total, 2) if total else 0.0,
+    }
+
+
+# ------------------ Stages ------------------
+
+
+def time_stages(files: list, mode: str, settings: dict) -> dict:
+    """
+    Run every document through each stage in turn, timing the calls
+    separately. Returns {stage: [seconds per document]}.
+    """
+    from extractor import (
+        extract_keywords_llm,
+        extract_keywords_tfidf,
+        summarize_llm,
+        summarize_rule_based,
+    )
+    from file_handler import (
+        extract_text_from_file,
+        get_report_writer,
+        log_to_report,
+        move_file_to_topic_folder,
+    )
+    from llm_classifier import classify_with_llm
+    from memory_store import store_file_metadata
+    from rule_based_classifier import classify_rule_based
+
+    if mode == "llm":
+        classify, keywords_of, summary_of = (
+            classify_with_llm,
+            extract_keywords_llm,
+            summarize_llm,
+        )
+    else:
+        classify, keywords_of, summary_of = (
+            classify_rule_based,
+            extract_keywords_tfidf,
+            summarize_rule_based,
+        )
+
+    times = {stage: [] for stage in STAGES}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        times[stage].append(time.perf_counter() - start)
+        return result
+
+    for path in files:
+        text = timed(
+            "extract",
+            extract_text_from_file,
+            path,
+            settings["word_budget"],
+            settings["sample_pages"],
+        )
+        topic = timed("classify", classify, text)
+        keywords = timed("keywords", keywords_of, text)
+        summary = timed("summary", summary_of, text)
+        moved = timed("move", move_file_to_topic_folder, path, topic) or path
+        filename = os.path.basename(moved)
+        timed("store", store_file_metadata, filename, topic, keywords, summary)
+        timed("report", log_to_report, moved, topic, keywords, summary)
+
+    # Rows are buffered; charge the final write to the report stage
+    start = time.perf_counter()
+    get_report_writer().flush()
+    if times["report"]:
+        times["report"][-1] += time.perf_counter() - start
+    return times
+
+
+def time_pipeline(files: list, settings: dict) -> dict:
+    """
+    End-to-end docs/sec through PipelineExecutor (parallel extraction).
+    """
+    from file_handler import get_report_writer
+    from pipeline import PipelineExecutor
+
+    executor = PipelineExecutor(settings)
+    start = time.perf_counter()
+    errors = sum(1 for record in executor.run(files) if record.get("error"))
+    get_report_writer().flush()
+    elapsed = time.perf_counter() - start
+    return {
+        "docs": len(files),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(len(files) / elapsed, 2) if elapsed else 0.0,
+        "stages": executor.stats()["stages"],
+    }
+
+
+# ------------------ Run ------------------
+
+
+def run_benchmark(
+    n_docs: int = 100,
+    formats: tuple = ("pdf", "docx", "txt"),
+    min_pages: int = 1,
+    max_pages: int = 5,
+    mode: str = "llm",
+    duplicate_rate: float = 0.0,
+    prompt_token_seconds: float = 0.0002,
+    token_seconds: float = 0.02,
+    seed: int = 0,
+    workdir: str = None,
+) -> dict:
+    """
+    Generate a corpus, time each stage per document, then time the full
+    pipeline on a fresh copy, plus import / CLI startup times. Returns the
+    JSON-serializable results.
+    """
+    workdir = os.path.abspath(workdir or tempfile.mkdtemp(prefix="insightsort-bench-"))
+    corpus_dir = os.path.join(workdir, "corpus")
+    files = generate_corpus(
+        corpus_dir, n_docs, formats, min_pages, max_pages, duplicate_rate, seed
+    )
+
+    config_path = os.path.join(workdir, "bench_config.yaml")
+    with open(config_path, "w") as f:
+        yaml.safe_dump(bench_config(mode, duplicate_rate > 0), f)
+
+    from utils import set_config_path
+
+    set_config_path(config_path)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from file_handler import setup_logging
+
+        setup_logging()
+        _install_stub(
+            StubLlama(
+                prompt_token_seconds=prompt_token_seconds, token_seconds=token_seconds
+            )
+        )
+        from pipeline import load_pipeline_settings
+
+        settings = load_pipeline_settings()
+
+        copies = []
+        for name in ("stages", "pipeline"):
+            target = os.path.join(workdir, name)
+            shutil.copytree(corpus_dir, target)
+            copies.append([os.path.join(target, os.path.basename(p)) for p in files])
+
+        from metrics import summarize_metrics
+
+        stage_times = time_stages(copies[0], mode, settings)
+        pipeline = time_pipeline(copies[1], settings)
+    finally:
+        os.chdir(cwd)
+
+    startup = measure_startup()
+    per_doc = [sum(ts) for ts in zip(*stage_times.values())]
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {
+            "docs": n_docs,
+            "formats": list(formats),
+            "pages": [min_pages, max_pages],
+            "mode": mode,
+            "duplicate_rate": duplicate_rate,
+            "prompt_token_seconds": prompt_token_seconds,
+            "token_seconds": token_seconds,
+            "seed": seed,
+        },
+        "stages": {stage: summarize_times(ts) for stage, ts in stage_times.items()},
+        "sequential": summarize_times(per_doc),
+        "pipeline": pipeline,
+        "metrics": summarize_metrics(),
+        "startup": startup,
+    }
+
+
+# ------------------ Baseline ------------------
+
+
+def compare_to_baseline(
+    results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE
+) -> list:
+    """
+    Regressions against a stored baseline: a stage whose p95 grew, or whose
+    docs/sec dropped, by more than `tolerance`. Returns readable messages.
+    """
+    if baseline.get("params") != results.get("params"):
+        print(
+            "[Bench] Warning: baseline was run with different params", file=sys.stderr
+        )
+
+    regressions = []
+    pairs = [
+        (f"stage {s}", results["stages"][s], baseline.get("stages", {}).get(s))
+        for s in STAGES
+    ]
+    pairs.append(("sequential", results["sequential"], baseline.get("sequential")))
+    for name, now, then in pairs:
+        if not then or max(now["p95_ms"], then["p95_ms"]) < MIN_COMPARE_MS:
+            continue
+        if now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {then['p95_ms']:.3f} ms -> {now['p95_ms']:.3f} ms"
+            )
+        if then["docs_per_sec"] and now["docs_per_sec"] < then["docs_per_sec"] * (
+            1 - tolerance
+        ):
+            regressions.append(
+                f"{name}: {then['docs_per_sec']:.2f} -> {now['docs_per_sec']:.2f} docs/sec"
+            )
+
+    startup = baseline.get("startup") or {}
+    timings = [
+        ("cli --help", results["startup"]["cli_help_ms"], startup.get("cli_help_ms"))
+    ]
+    for module, now in results["startup"]["imports"].items():
+        then = (startup.get("imports") or {}).get(module) or {}
+        timings.append((f"import {module}", now.get("total_ms"), then.get("total_ms")))
+    for name, now, then in timings:
+        if now and then and now > then * (1 + tolerance):
+            regressions.append(f"{name}: {then:.1f} ms -> {now:.1f} ms")
+
+    then = (baseline.get("pipeline") or {}).get("docs_per_sec")
+    now = results["pipeline"]["docs_per_sec"]
+    if then and now < then * (1 - tolerance):
+        regressions.append(f"pipeline: {then:.2f} -> {now:.2f} docs/sec")
+    return regressions
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,73 @@
+"""
+Startup cost: `python -X importtime` for the GUI and CLI entry modules and
+the wall time of `python -m insightsort --help`, each in a fresh
+interpreter.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["app", "insightsort", "pipeline"]
+
+
+def _run(args: list, cwd: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable] + args, cwd=cwd, env=env, capture_output=True, text=True
+    )
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    [(module, self_us, cumulative_us)] from -X importtime output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_time(module: str, cwd: str, top: int = 10) -> dict:
+    result = _run(["-X", "importtime", "-c", f"import {module}"], cwd)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    rows = parse_importtime(result.stderr)
+    total = next((cum for name, _, cum in rows if name == module), 0)
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total / 1000, 1),
+        "slowest": [
+            {"module": name, "self_ms": round(own / 1000, 1)}
+            for name, own, _ in slowest
+        ],
+    }
+
+
+def cli_help_time(cwd: str, runs: int = 3) -> float:
+    """
+    Median wall time of `python -m insightsort --help`, in milliseconds.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(["-m", "insightsort", "--help"], cwd)
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 1)
+
+
+def measure_startup(modules: list = MODULES) -> dict:
+    # An empty directory: importing must not depend on (or create) files
+    with tempfile.TemporaryDirectory(prefix="insightsort-startup-") as cwd:
+        return {
+            "imports": {module: import_time(module, cwd) for module in modules},
+            "cli_help_ms": cli_help_time(cwd),
+            "created_files": sorted(os.listdir(cwd)),
+        }
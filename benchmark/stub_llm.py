@@ -0,0 +1,121 @@
+"""
+Deterministic stand-in for llama_cpp.Llama.
+
+Answers every InsightSort prompt (classify, keywords, summary, fused JSON
+analysis, embeddings) from a hash of the document, and
+sleeps to simulate model latency. Like llama_cpp it keeps the last
+prompt's tokens and only "evaluates" the part after the common prefix, so
+prefix reuse shows up in the timings.
+"""
+
+import hashlib
+import json
+import re
+import time
+import zlib
+
+import numpy as np
+
+TOPICS = ["Tech", "Health", "Finance", "Education", "Legal", "Personal", "Notes"]
+VOCAB_SIZE = 32000
+EMBEDDING_DIM = 64
+
+_TOKEN_RE = re.compile(r"\s*\S+|\s+")
+
+
+class StubLlama:
+    """
+    Latency model: `load_seconds` once, then `prompt_token_seconds` per
+    evaluated prompt token and `token_seconds` per generated token.
+    """
+
+    def __init__(
+        self,
+        n_ctx: int = 2048,
+        prompt_token_seconds: float = 0.0002,
+        token_seconds: float = 0.02,
+        load_seconds: float = 0.0,
+    ):
+        self.n_ctx = n_ctx
+        self.prompt_token_seconds = prompt_token_seconds
+        self.token_seconds = token_seconds
+        self.input_ids = np.zeros(n_ctx, dtype=np.intc)
+        self.n_tokens = 0
+        self._pieces = {}
+        time.sleep(load_seconds)
+
+    # ---- Tokens ----
+
+    def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False):
+        tokens = [1] if add_bos else []
+        for piece in _TOKEN_RE.findall(text.decode("utf-8", errors="ignore")):
+            token = 2 + zlib.crc32(piece.encode("utf-8")) % (VOCAB_SIZE - 2)
+            self._pieces[token] = piece
+            tokens.append(token)
+        return tokens
+
+    def detokenize(self, tokens) -> bytes:
+        return "".join(self._pieces.get(t, "") for t in tokens).encode("utf-8")
+
+    def eval(self, tokens):
+        tokens = list(tokens)
+        end = min(self.n_tokens + len(tokens), self.n_ctx)
+        self.input_ids[self.n_tokens : end] = tokens[: end - self.n_tokens]
+        self.n_tokens = end
+        time.sleep(len(tokens) * self.prompt_token_seconds)
+
+    # ---- Completion ----
+
+    def __call__(self, prompt: str, max_tokens: int = 16, **params) -> dict:
+        tokens = self.tokenize(prompt.encode("utf-8"))
+        reused = 0
+        for a, b in zip(self.input_ids[: self.n_tokens], tokens[:-1]):
+            if a != b:
+                break
+            reused += 1
+        self.n_tokens = reused
+        self.eval(tokens[reused:])
+
+        text = self._answer(prompt)
+        generated = min(
+            len(self.tokenize(text.encode("utf-8"), add_bos=False)), max_tokens
+        )
+        time.sleep(generated * self.token_seconds)
+        return {
+            "choices": [{"text": text, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(tokens), "completion_tokens": generated},
+        }
+
+    def _answer(self, prompt: str) -> str:
+        doc = _document(prompt)
+        words = [w for w in re.findall(r"[a-z]{4,}", doc.lower())]
+        keywords = list(dict.fromkeys(words))[:5] or ["document"]
+        summary = " ".join(doc.split()[:25]) + "."
+        if "JSON" in prompt:
+            return json.dumps(
+                {"topic": _topic(doc), "keywords": keywords, "summary": summary}
+            )
+        if "keywords" in prompt.lower():
+            return ", ".join(keywords)
+        if "summar" in prompt.lower():
+            return summary
+        return _topic(doc)
+
+    # ---- Embeddings ----
+
+    def embed(self, text: str) -> list:
+        time.sleep(len(self.tokenize(text.encode("utf-8"))) * self.prompt_token_seconds)
+        seed = int.from_bytes(
+            hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "big"
+        )
+        return np.random.default_rng(seed).normal(size=EMBEDDING_DIM).tolist()
+
+
+def _document(prompt: str) -> str:
+    match = re.search(r'"""(.*?)"""', prompt, re.DOTALL)
+    return match.group(1) if match else prompt
+
+
+def _topic(doc: str) -> str:
+    digest = hashlib.blake2b(doc.strip().encode("utf-8"), digest_size=2).digest()
+    return TOPICS[int.from_bytes(digest, "big") % len(TOPICS)]
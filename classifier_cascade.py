@@ -0,0 +1,161 @@
+import logging
+import threading
+
+import numpy as np
+
+from embedding_classifier import get_embedding_classifier
+from rule_based_classifier import get_rule_matcher
+from utils import load_config
+
+# ------------------ Config ------------------
+
+DEFAULT_STAGES = ["rules", "embedding", "llm"]
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_MIN_MARGIN = 0.15
+
+# Softmax temperatures that turn each stage's raw scores into confidences.
+# Rule scores are keyword counts; embedding scores are cosine similarities.
+DEFAULT_TEMPERATURES = {"rules": 1.0, "embedding": 0.05}
+
+
+def load_cascade_settings(config: dict = None) -> dict:
+    if config is None:
+        config = load_config()
+    classifier = config.get("classifier") or {}
+    cascade = classifier.get("cascade") or {}
+    return {
+        "enabled": bool(cascade.get("enabled", False)),
+        "stages": list(cascade.get("stages") or DEFAULT_STAGES),
+        "confidence_threshold": float(
+            classifier.get("confidence_threshold", DEFAULT_THRESHOLD)
+        ),
+        "min_margin": float(cascade.get("min_margin", DEFAULT_MIN_MARGIN)),
+        "temperatures": {
+            **DEFAULT_TEMPERATURES,
+            **(cascade.get("temperatures") or {}),
+        },
+    }
+
+
+# ------------------ Confidence ------------------
+
+
+def confidences(scores: np.ndarray, temperature: float) -> np.ndarray:
+    """
+    Temperature-scaled softmax over one document's topic scores.
+    """
+    z = np.asarray(scores, dtype=float) / temperature
+    z = np.exp(z - z.max())
+    return z / z.sum()
+
+
+def _rule_scores(text: str) -> tuple:
+    matcher = get_rule_matcher()
+    return matcher.score_batch([text])[0], matcher.topics
+
+
+def _embedding_scores(text: str) -> tuple:
+    classifier = get_embedding_classifier()
+    return classifier.similarities([text])[0], classifier.topics
+
+
+STAGE_SCORERS = {"rules": _rule_scores, "embedding": _embedding_scores}
+
+# ------------------ Cascade ------------------
+
+
+class ClassifierCascade:
+    """
+    Run cheap classifiers first and stop at the first confident answer.
+
+    A stage accepts when its top confidence reaches `confidence_threshold`
+    and beats the runner-up by at least `min_margin`; otherwise the document
+    escalates to the next stage. "llm" is always terminal: reaching it means
+    the caller should classify with the LLM.
+    """
+
+    def __init__(self, settings: dict = None):
+        settings = settings or load_cascade_settings()
+        self.stages = [
+            s for s in settings["stages"] if s in STAGE_SCORERS or s == "llm"
+        ]
+        self.threshold = settings["confidence_threshold"]
+        self.min_margin = settings["min_margin"]
+        self.temperatures = settings["temperatures"]
+        self._stats = {stage: {"calls": 0, "accepted": 0} for stage in self.stages}
+        self._lock = threading.Lock()
+
+    def classify(self, text: str) -> dict:
+        """
+        Returns {"topic", "confidence", "stage", "escalate"}. With `escalate`
+        the cheap stages were not confident and "topic" is their best guess.
+        """
+        best = {"topic": None, "confidence": 0.0, "stage": None, "escalate": True}
+        for stage in self.stages:
+            self._count(stage, "calls")
+            if stage == "llm":
+                return best
+
+            try:
+                scores, topics = STAGE_SCORERS[stage](text)
+            except Exception as e:
+                logging.error(f"[Cascade] Stage {stage} failed: {e}")
+                continue
+            probs = confidences(scores, self.temperatures.get(stage, 1.0))
+            top2 = np.argsort(probs)[::-1][:2]
+            confidence = float(probs[top2[0]])
+            margin = confidence - float(probs[top2[1]]) if len(top2) > 1 else 1.0
+
+            if confidence > best["confidence"]:
+                best = {
+                    "topic": topics[top2[0]],
+                    "confidence": confidence,
+                    "stage": stage,
+                    "escalate": True,
+                }
+            if confidence >= self.threshold and margin >= self.min_margin:
+                self._count(stage, "accepted")
+                logging.info(
+                    f"[Cascade] {stage} classified as: {best['topic']} ({confidence:.2f})"
+                )
+                return {**best, "escalate": False}
+
+        # No LLM stage configured: the most confident cheap answer stands
+        return {**best, "escalate": False}
+
+    def _count(self, stage: str, field: str):
+        with self._lock:
+            self._stats[stage][field] += 1
+
+    def stats(self) -> dict:
+        """
+        Per-stage calls, accepted answers and escalation rate.
+        """
+        with self._lock:
+            stats = {stage: dict(counts) for stage, counts in self._stats.items()}
+        for counts in stats.values():
+            escalated = counts["calls"] - counts["accepted"]
+            counts["escalation_rate"] = (
+                escalated / counts["calls"] if counts["calls"] else 0.0
+            )
+        # Reaching the LLM is the end of the line, not an escalation
+        if "llm" in stats:
+            stats["llm"]["accepted"] = stats["llm"]["calls"]
+            stats["llm"]["escalation_rate"] = 0.0
+        return stats
+
+
+_cascade = None
+_cascade_lock = threading.Lock()
+
+
+def get_cascade(settings: dict = None) -> ClassifierCascade:
+    global _cascade
+    with _cascade_lock:
+        if _cascade is None:
+            _cascade = ClassifierCascade(settings)
+    return _cascade
+
+
+def get_cascade_stats() -> dict:
+    return get_cascade().stats() if _cascade is not None else {}
@@ -0,0 +1,210 @@
+import logging
+import threading
+
+import numpy as np
+
+from llm_classifier import TOPIC_LIST
+from memory_store import MemoryStore, get_store
+from prompts import prepare_document_text
+from rule_based_classifier import TOPIC_KEYWORDS
+from utils import clean_text, load_config
+
+# ------------------ Config ------------------
+
+HASH_FEATURES = 2**16  # Dimensions of the built-in hashed bag-of-words embedding
+SEED_WEIGHT = 5.0  # A seed description counts as this many labeled documents
+REFINE_ROWS = 5000  # Most recent labeled rows used to refine the centroids
+DEFAULT_TOPIC = "Misc"  # When no centroid is similar enough (e.g. empty text)
+
+TOPIC_DESCRIPTIONS = {
+    "Tech": "technology software programming code computers servers data",
+    "Health": "health medicine doctor patient hospital treatment diet disease",
+    "Finance": "finance money bank investment stock market budget tax trading",
+    "Education": "education student school university teacher exam course grades",
+    "Legal": "legal law contract court attorney lawyer rights agreement clause",
+    "Personal": "personal journal diary my life feelings family friends reflection",
+    "Notes": "notes meeting minutes summary to-do checklist action items agenda",
+    "Misc": "miscellaneous general other document",
+}
+
+# ------------------ Embedding Backends ------------------
+
+
+class HashingEmbedder:
+    """
+    Lightweight local embedding: sublinear hashed term counts as a sparse
+    matrix. Needs no model file and embeds thousands of documents per second.
+    """
+
+    def __init__(self, n_features: int = HASH_FEATURES):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words="english",
+            alternate_sign=False,
+            norm=None,
+        )
+
+    def embed(self, texts: list):
+        X = self.vectorizer.transform([clean_text(t) for t in texts]).tocsr()
+        X.sum_duplicates()
+        X.data = 1.0 + np.log(X.data)
+        return X.astype(np.float32)
+
+
+class LlamaEmbedder:
+    """
+    Embeddings from the llama_cpp model configured as llm.embedding_model.
+    """
+
+    def embed(self, texts: list) -> np.ndarray:
+        from llm_engine import embed
+
+        vectors = []
+        for vector in embed([prepare_document_text(t) for t in texts]):
+            vector = np.asarray(vector, dtype=np.float32)
+            if vector.ndim == 2:  # Per-token embeddings; mean-pool them
+                vector = vector.mean(axis=0)
+            vectors.append(vector)
+        return np.vstack(vectors)
+
+
+def get_embedder():
+    llm_config = load_config().get("llm") or {}
+    if llm_config.get("embedding_model"):
+        return LlamaEmbedder()
+    return HashingEmbedder()
+
+
+# ------------------ Nearest-Centroid Classifier ------------------
+
+
+def _dense(matrix) -> np.ndarray:
+    from scipy import sparse
+
+    return matrix.toarray() if sparse.issparse(matrix) else np.asarray(matrix)
+
+
+class EmbeddingClassifier:
+    """
+    Classify by cosine similarity to one centroid per topic.
+
+    Centroids start from TOPIC_DESCRIPTIONS (plus the rule keywords) and are
+    refined with the keywords and summaries of documents already labeled in
+    the memory DB. Classifying is one embedding pass and a matrix product.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        store: MemoryStore = None,
+        topics=None,
+        min_similarity: float = None,
+    ):
+        self.embedder = embedder or get_embedder()
+        self.store = store or get_store()
+        self.topics = list(topics or TOPIC_LIST)
+        if min_similarity is None:
+            classifier = load_config().get("classifier") or {}
+            min_similarity = classifier.get("embedding_min_similarity", 0.0)
+        # The best match must be above this, else DEFAULT_TOPIC
+        self.min_similarity = float(min_similarity)
+        self.centroids = None  # topics x dims, L2-normalized rows
+        self._lock = threading.Lock()
+
+    def build(self, refine_rows: int = REFINE_ROWS):
+        """
+        (Re)compute the centroid matrix from the seeds and labeled rows.
+        """
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        seeds = [
+            " ".join(
+                [TOPIC_DESCRIPTIONS.get(topic, topic)] + TOPIC_KEYWORDS.get(topic, [])
+            )
+            for topic in self.topics
+        ]
+        sums = SEED_WEIGHT * _dense(normalize(self.embedder.embed(seeds)))
+
+        labeled = 0
+        try:
+            rows = self.store.get_processing_history(limit=refine_rows)
+        except Exception as e:
+            logging.error(f"[Embedding] Failed to read labeled rows: {e}")
+            rows = []
+        index = {topic: i for i, topic in enumerate(self.topics)}
+        rows = [row for row in rows if row[1] in index]
+        if rows:
+            texts = [f"{keywords} {summary}" for _, _, keywords, summary, _ in rows]
+            vectors = normalize(self.embedder.embed(texts))
+            # topics x rows indicator, so per-topic sums are one product
+            labels = sparse.csr_matrix(
+                (
+                    np.ones(len(rows)),
+                    ([index[row[1]] for row in rows], np.arange(len(rows))),
+                ),
+                shape=(len(self.topics), len(rows)),
+            )
+            sums += _dense(labels @ vectors)
+            labeled = len(rows)
+
+        with self._lock:
+            self.centroids = normalize(sums).astype(np.float32)
+        logging.info(
+            f"[Embedding] Built {len(self.topics)} centroids from {labeled} labeled rows"
+        )
+
+    def similarities(self, texts: list) -> np.ndarray:
+        """
+        Cosine similarity of each text to each topic (docs x topics).
+        """
+        from sklearn.preprocessing import normalize
+
+        if self.centroids is None:
+            self.build()
+        vectors = normalize(self.embedder.embed(texts))
+        return _dense(vectors @ self.centroids.T)
+
+    def score(self, text: str) -> dict:
+        return dict(zip(self.topics, self.similarities([text])[0].tolist()))
+
+    def classify(self, text: str) -> str:
+        sims = self.similarities([text])[0]
+        best = int(np.argmax(sims))
+        if sims[best] <= self.min_similarity:
+            return DEFAULT_TOPIC
+        return self.topics[best]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_embedding_classifier() -> EmbeddingClassifier:
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = EmbeddingClassifier()
+    return _classifier
+
+
+# ------------------ Classification Logic ------------------
+
+
+def classify_embedding(text: str) -> str:
+    try:
+        topic = get_embedding_classifier().classify(text)
+        logging.info(f"[Embedding] Classified as: {topic}")
+        return topic
+    except Exception as e:
+        logging.error(f"[Embedding] Classification failed: {e}")
+        return DEFAULT_TOPIC
+
+
+def score_embedding(text: str) -> dict:
+    """
+    Returns {topic: cosine similarity} for every topic.
+    """
+    return get_embedding_classifier().score(text)
@@ -1,64 +1,72 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from utils import clean_text, truncate_text
-from llama_cpp import Llama
+from keyword_engine import get_keyword_engine
+from llm_cache import cache_get, cache_put, make_cache_key
+from llm_engine import generate
+from prompts import (
+    DOCUMENT_PREFIX,
+    KEYWORD_SUFFIX,
+    SUMMARY_SUFFIX,
+    prepare_document_text,
+)
 import logging
 
-# --------------- Config ------------------
-
-MODEL_PATH = "models/mistral-7b-instruct-v0.1.Q2_K.gguf"
-N_CTX = 2048
-
-# --------------- LLM Init ------------------
-
-try:
-    llm = Llama(model_path=MODEL_PATH, n_ctx=N_CTX, n_threads=8, verbose=False)
-except Exception as e:
-    raise RuntimeError(f"Failed to load LLM in extractor.py: {e}")
-
 # --------------- Keyword Extraction (TF-IDF) ------------------
 
 
-def extract_keywords_tfidf(text: str, top_n: int = 5) -> list:
+def extract_keywords_tfidf(text: str, top_n: int = 5, update: bool = False) -> list:
+    """
+    With `update`, the text is counted in the corpus DF table (only for
+    documents that are being stored).
+    """
     try:
-        text = clean_text(text)
-        vectorizer = TfidfVectorizer(stop_words="english")
-        X = vectorizer.fit_transform([text])
-        scores = zip(vectorizer.get_feature_names_out(), X.toarray()[0])
-        sorted_scores = sorted(scores, key=lambda x: x[1], reverse=True)
-        keywords = [word for word, score in sorted_scores[:top_n]]
-        return keywords
+        return get_keyword_engine().extract_keywords([text], top_n, update)[0]
     except Exception as e:
         logging.error(f"[TF-IDF] Keyword extraction failed: {e}")
         return []
 
 
-# --------------- Keyword Extraction (LLM) ------------------
+def extract_keywords_tfidf_batch(
+    texts: list, top_n: int = 5, update: bool = False
+) -> list:
+    """
+    Score many documents against the corpus DF table in one sparse pass.
+    """
+    try:
+        return get_keyword_engine().extract_keywords(texts, top_n, update)
+    except Exception as e:
+        logging.error(f"[TF-IDF] Batch keyword extraction failed: {e}")
+        return [[] for _ in texts]
 
-KEYWORD_PROMPT = """
-Extract the 5 most important keywords from the following document:
 
-\"\"\"
-{text}
-\"\"\"
+# --------------- Keyword Extraction (LLM) ------------------
 
-Return them as a comma-separated list only.
-"""
+KEYWORD_PROMPT = DOCUMENT_PREFIX + KEYWORD_SUFFIX
+KEYWORD_PARAMS = {"stop": ["\n"], "temperature": 0.2, "max_tokens": 40}
 
 
 def extract_keywords_llm(text: str, top_n: int = 5) -> list:
     try:
-        prompt = KEYWORD_PROMPT.format(
-            text=truncate_text(clean_text(text), max_words=400)
-        )
-        output = llm(prompt, stop=["\n"], temperature=0.2, max_tokens=40)
-        response = output["choices"][0]["text"].strip()
-        keywords = [kw.strip() for kw in response.split(",") if kw.strip()]
+        text = prepare_document_text(text)
+        cache_key = make_cache_key("keywords", text, KEYWORD_PARAMS)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached[:top_n]
+
+        prompt = KEYWORD_PROMPT.format(text=text)
+        output = generate(prompt, **KEYWORD_PARAMS)
+        keywords = parse_keywords(output["choices"][0]["text"])
+        if keywords:
+            cache_put(cache_key, "keywords", keywords)
         return keywords[:top_n]
     except Exception as e:
         logging.error(f"[LLM] Keyword extraction failed: {e}")
         return []
 
 
+def parse_keywords(response: str, top_n: int = 5) -> list:
+    keywords = [kw.strip() for kw in response.strip().split(",") if kw.strip()]
+    return keywords[:top_n]
+
+
 # --------------- Summary (Rule-based) ------------------
 
 
@@ -76,22 +84,24 @@ def summarize_rule_based(text: str, max_sentences: int = 3) -> str:
 
 # --------------- Summary (LLM) ------------------
 
-SUMMARY_PROMPT = """
-Summarize the following document in 2–3 sentences:
-
-\"\"\"
-{text}
-\"\"\"
-"""
+SUMMARY_PROMPT = DOCUMENT_PREFIX + SUMMARY_SUFFIX
+SUMMARY_PARAMS = {"stop": ["\n\n"], "temperature": 0.3, "max_tokens": 100}
 
 
 def summarize_llm(text: str) -> str:
     try:
-        prompt = SUMMARY_PROMPT.format(
-            text=truncate_text(clean_text(text), max_words=500)
-        )
-        output = llm(prompt, stop=["\n\n"], temperature=0.3, max_tokens=100)
-        return output["choices"][0]["text"].strip()
+        text = prepare_document_text(text)
+        cache_key = make_cache_key("summary", text, SUMMARY_PARAMS)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = SUMMARY_PROMPT.format(text=text)
+        output = generate(prompt, **SUMMARY_PARAMS)
+        summary = output["choices"][0]["text"].strip()
+        if summary:
+            cache_put(cache_key, "summary", summary)
+        return summary
     except Exception as e:
         logging.error(f"[LLM] Summary failed: {e}")
         return ""
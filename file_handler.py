@@ -1,10 +1,15 @@
+import atexit
+import csv
 import os
 import shutil
-import pandas as pd
+import signal
+import threading
+import time
 import logging
-import fitz  # PyMuPDF
-import docx2txt
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from utils import clean_text
 
@@ -17,40 +22,110 @@ ORGANIZED_DIR = os.path.join("output", "organized")
 
 # ------------------ Setup Logging ------------------
 
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
 
-# ------------------ File Parsing ------------------
+def setup_logging(path: str = LOG_PATH):
+    """
+    Send INFO and above to the process log. Called by the entry points
+    (GUI, CLI, benchmark), not on import.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    logging.basicConfig(
+        filename=path,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
 
 
-def extract_text_from_file(file_path: str) -> str:
-    ext = os.path.splitext(file_path)[1].lower()
+# ------------------ File Parsing ------------------
+
 
+def extract_text_from_file(
+    file_path: str, max_words: int = None, sample_pages: int = 0
+) -> str:
     try:
-        if ext == ".pdf":
-            return extract_pdf(file_path)
-        elif ext == ".txt":
-            return extract_txt(file_path)
-        elif ext == ".docx":
-            return extract_docx(file_path)
-        else:
-            logging.warning(f"Unsupported file type: {file_path}")
-            return ""
+        text, _ = extract_text_with_stats(file_path, max_words, sample_pages)
+        return text
     except Exception as e:
         logging.error(f"Failed to extract from {file_path}: {e}")
         return ""
 
 
-def extract_pdf(file_path):
-    text = ""
+def extract_text_with_stats(
+    file_path: str, max_words: int = None, sample_pages: int = 0
+) -> tuple:
+    """
+    Extract text and return (text, stats). Raises on parse errors.
+
+    `max_words` and `sample_pages` only apply to PDFs; see extract_pdf_with_stats.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == ".pdf":
+        return extract_pdf_with_stats(file_path, max_words, sample_pages)
+    elif ext == ".txt":
+        text = extract_txt(file_path)
+    elif ext == ".docx":
+        text = extract_docx(file_path)
+    else:
+        logging.warning(f"Unsupported file type: {file_path}")
+        text = ""
+    return text, {"page_count": None, "pages_read": None, "bytes": len(text)}
+
+
+def extract_pdf(file_path, max_words: int = None, sample_pages: int = 0):
+    text, _ = extract_pdf_with_stats(file_path, max_words, sample_pages)
+    return text
+
+
+def extract_pdf_with_stats(
+    file_path: str, max_words: int = None, sample_pages: int = 0
+) -> tuple:
+    """
+    Read PDF pages lazily until `max_words` words have been collected.
+
+    If the budget runs out before the end, up to `sample_pages` evenly spaced
+    later pages are also read (a short excerpt of each) so the text is not
+    just the front matter. With no budget every page is read.
+    """
+    import fitz  # PyMuPDF; imported on first PDF, not at startup
+
+    parts = []
+    words = 0
+    pages_read = 0
+
     with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return clean_text(text)
+        page_count = doc.page_count
+
+        for page_number in range(page_count):
+            page_text = doc.load_page(page_number).get_text()
+            parts.append(page_text)
+            pages_read += 1
+            if max_words:
+                words += len(page_text.split())
+                if words >= max_words:
+                    break
+
+        remaining = range(pages_read, page_count)
+        if max_words and sample_pages and remaining:
+            samples = min(sample_pages, len(remaining))
+            step = len(remaining) / (samples + 1)
+            excerpt_words = max(50, max_words // 10)
+            for i in range(1, samples + 1):
+                page_text = doc.load_page(remaining[int(i * step)]).get_text()
+                parts.append(" ".join(page_text.split()[:excerpt_words]))
+                pages_read += 1
+
+    text = clean_text("\n".join(parts))
+    stats = {
+        "page_count": page_count,
+        "pages_read": pages_read,
+        "bytes": len(text),
+    }
+    if pages_read < page_count:
+        logging.info(
+            f"[PDF] Read {pages_read}/{page_count} pages of {os.path.basename(file_path)}"
+        )
+    return text, stats
 
 
 def extract_txt(file_path):
@@ -59,10 +134,206 @@ def extract_txt(file_path):
 
 
 def extract_docx(file_path):
+    import docx2txt
+
     text = docx2txt.process(file_path)
     return clean_text(text)
 
 
+# ------------------ Parallel Extraction ------------------
+
+
+def _extract_timed(file_path: str, max_words: int, sample_pages: int) -> tuple:
+    start = time.perf_counter()
+    text, stats = extract_text_with_stats(file_path, max_words, sample_pages)
+    return text, time.perf_counter() - start, stats
+
+
+def _ignore_sigint():
+    # Ctrl+C is the main process's to handle; it shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ExtractionPool:
+    """
+    A process pool that can be replaced in place, so one set of worker
+    processes can serve many extract_texts_parallel() calls. Workers ignore
+    SIGINT.
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_sigint)
+
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+
+    def restart(self):
+        _terminate_pool(self.executor)
+        self.executor = self._new_executor()
+
+    def close(self, terminate: bool = False):
+        if terminate:
+            _terminate_pool(self.executor)
+        else:
+            self.executor.shutdown()
+
+
+def extract_texts_parallel(
+    file_paths,
+    workers: int = None,
+    timeout: float = None,
+    max_words: int = None,
+    sample_pages: int = 0,
+    with_stats: bool = False,
+    pool: ExtractionPool = None,
+):
+    """
+    Extract many files across a process pool.
+
+    Yields (path, text, error, elapsed) as each file completes, in completion
+    order, with the extraction stats appended when `with_stats` is set.
+    `error` is None on success. At most `workers` files are in flight,
+    so a file's clock starts when it is handed to a worker; one that runs past
+    `timeout` seconds is reported as failed and the pool is replaced, since a
+    stuck parser process cannot be cancelled on its own. A worker that dies
+    (segfault, OOM kill) breaks the whole pool: it is rebuilt, and only the
+    file that crashed it is reported as failed.
+
+    Pass a `pool` to reuse its workers (and `workers` is taken from it);
+    otherwise a pool is created for this call and shut down afterwards.
+    """
+    own_pool = pool is None
+    pool = pool or ExtractionPool(workers)
+    workers = pool.workers
+    paths = iter(file_paths)
+    in_flight = {}  # future -> (path, submitted_at)
+    retry = deque()  # Interrupted by a pool restart; resubmitted first
+    suspects = deque()  # In flight when a worker died; rerun one at a time
+    failed = deque()  # Results produced outside the main loop
+
+    def result_of(path, text, error, elapsed, stats=None):
+        return (path, text, error, elapsed) + ((stats,) if with_stats else ())
+
+    def restart_pool(crashed: list = None):
+        """
+        Replace the pool. On a deliberate restart (`crashed` is None) the
+        files in flight are resubmitted. After a worker died, `crashed`
+        (futures reported broken) and everything else in flight are
+        suspects: a lone one is the culprit, several are rerun one at a
+        time to find it.
+        """
+        if crashed is None:
+            retry.extend(path for path, _ in in_flight.values())
+            crashed = []
+        else:
+            crashed = list(crashed) + list(in_flight.values())
+        in_flight.clear()
+        pool.restart()
+
+        if len(crashed) == 1:
+            path, submitted_at = crashed[0]
+            logging.error(f"Extraction worker crashed on {path}")
+            elapsed = time.perf_counter() - submitted_at
+            failed.append(result_of(path, "", "extraction worker crashed", elapsed))
+        elif crashed:
+            logging.warning(
+                f"Extraction worker crashed with {len(crashed)} files in flight; "
+                "retrying them one at a time"
+            )
+            suspects.extend(path for path, _ in crashed)
+
+    def submit_next():
+        if suspects:
+            if in_flight:
+                return False
+            path = suspects.popleft()
+        elif retry:
+            path = retry.popleft()
+        else:
+            path = next(paths, None)
+            if path is None:
+                return False
+        try:
+            future = pool.submit(_extract_timed, path, max_words, sample_pages)
+        except BrokenProcessPool:
+            # A worker died since the last wait(); this file never started
+            retry.appendleft(path)
+            restart_pool(crashed=[])
+            return True
+        in_flight[future] = (path, time.perf_counter())
+        return True
+
+    try:
+        while len(in_flight) < workers and submit_next():
+            pass
+
+        while in_flight or failed:
+            while failed:
+                yield failed.popleft()
+            if not in_flight:
+                break
+
+            wait_for = None
+            if timeout:
+                oldest = min(submitted_at for _, submitted_at in in_flight.values())
+                wait_for = max(0.0, oldest + timeout - time.perf_counter())
+            done, _ = wait(
+                list(in_flight), timeout=wait_for, return_when=FIRST_COMPLETED
+            )
+
+            crashed = []
+            for future in done:
+                path, submitted_at = in_flight.pop(future)
+                try:
+                    text, elapsed, stats = future.result()
+                    yield result_of(path, text, None, elapsed, stats)
+                except BrokenProcessPool:
+                    crashed.append((path, submitted_at))
+                except Exception as e:
+                    logging.error(f"Failed to extract from {path}: {e}")
+                    elapsed = time.perf_counter() - submitted_at
+                    yield result_of(path, "", str(e), elapsed)
+            if crashed:
+                restart_pool(crashed)
+
+            now = time.perf_counter()
+            expired = [
+                future
+                for future, (_, submitted_at) in in_flight.items()
+                if timeout and now - submitted_at > timeout
+            ]
+            if expired:
+                for future in expired:
+                    path, submitted_at = in_flight.pop(future)
+                    logging.error(f"Extraction timed out after {timeout}s: {path}")
+                    yield result_of(
+                        path, "", f"timed out after {timeout}s", now - submitted_at
+                    )
+
+                # Restart the pool and resubmit whatever was still running
+                restart_pool()
+
+            while len(in_flight) < workers and submit_next():
+                pass
+    finally:
+        if own_pool:
+            pool.close(terminate=bool(in_flight))
+        elif in_flight:
+            pool.restart()  # Abandoned mid-run; don't leave work behind
+
+
+def _terminate_pool(pool: ProcessPoolExecutor):
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
 # ------------------ Folder Operations ------------------
 
 
@@ -73,7 +344,7 @@ def create_topic_folder(topic: str) -> str:
     return folder_path
 
 
-def move_file_to_topic_folder(file_path: str, topic: str):
+def move_file_to_topic_folder(file_path: str, topic: str) -> str:
     destination_folder = create_topic_folder(topic)
     filename = os.path.basename(file_path)
     destination_path = os.path.join(destination_folder, filename)
@@ -81,48 +352,236 @@ def move_file_to_topic_folder(file_path: str, topic: str):
     try:
         shutil.move(file_path, destination_path)
         logging.info(f"Moved: {filename} → {destination_folder}")
+        return destination_path
     except Exception as e:
         logging.error(f"Failed to move file: {file_path} → {e}")
+        return None
 
 
 # ------------------ Report Generation ------------------
 
 
-def log_to_report(file_path: str, topic: str, keywords: list, summary: str):
-    os.makedirs("output", exist_ok=True)
-
-    report_data = {
-        "filename": os.path.basename(file_path),
-        "topic": topic,
-        "keywords": ", ".join(keywords),
-        "summary": summary,
-        "processed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-    }
+REPORT_FIELDS = ["filename", "topic", "keywords", "summary", "processed_at"]
+# Microseconds, so a delete and a reprocess within one second stay ordered;
+# strings in this format (and older second-resolution ones) sort by time
+REPORT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
 
-    df = pd.DataFrame([report_data])
-    if not os.path.exists(REPORT_PATH):
-        df.to_csv(REPORT_PATH, index=False)
-    else:
-        df.to_csv(REPORT_PATH, mode="a", index=False, header=False)
+
+class ReportWriter:
+    """
+    Buffered CSV sink for report.csv.
+
+    Rows are kept in memory and written in one go when `flush_rows` are
+    pending, when the oldest pending row is `flush_seconds` old, or on
+    close (get_report_writer() closes the shared one at interpreter exit).
+    The file stays open between flushes and the header is only written when
+    the file is new or empty. Thread-safe.
+    """
+
+    def __init__(
+        self, path: str = REPORT_PATH, flush_rows: int = 200, flush_seconds: float = 2.0
+    ):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._rows = []
+        self._file = None
+        self._writer = None
+        self._lock = threading.RLock()
+
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def write(self, row: dict):
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) >= self.flush_rows:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._rows:
+                return
+            if self._file is None:
+                self._open()
+            self._writer.writerows(self._rows)
+            self._file.flush()
+            self._rows.clear()
+
+    def close(self):
+        """
+        Flush pending rows and release the file. Writing again reopens it.
+        """
+        with self._lock:
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"[Report] Failed to flush report: {e}")
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._writer = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=REPORT_FIELDS, lineterminator="\n"
+        )
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"[Report] Failed to flush report: {e}")
+
+
+_report_writer = None
+_report_writer_lock = threading.Lock()
+
+
+def get_report_writer() -> ReportWriter:
+    global _report_writer
+    with _report_writer_lock:
+        if _report_writer is None:
+            _report_writer = ReportWriter()
+            atexit.register(_report_writer.close)
+    return _report_writer
+
+
+def log_to_report(file_path: str, topic: str, keywords: list, summary: str):
+    get_report_writer().write(
+        {
+            "filename": os.path.basename(file_path),
+            "topic": topic,
+            "keywords": ", ".join(keywords),
+            "summary": summary,
+            "processed_at": datetime.now().strftime(REPORT_TIME_FORMAT),
+        }
+    )
 
 
 # ------------------ Report Deletion   ------------------
 
 
-def remove_from_report_csv(filename, csv_path="output/report.csv"):
+COMPACT_DELAY = 5.0  # Seconds of quiet after a delete before report.csv is rewritten
+
+_compaction_timer = None
+_compaction_lock = threading.Lock()
+
+
+def remove_from_report(filenames, delay: float = COMPACT_DELAY):
+    """
+    Delete report rows for many files at once.
+
+    The rows are tombstoned in the memory DB rather than removed from the
+    CSV right away; a background compaction rewrites report.csv once the
+    deletes have settled, so bulk deletes cost one rewrite instead of one
+    per file.
+    """
+    from memory_store import get_store
+
+    filenames = list(filenames)
+    if not filenames:
+        return
+    try:
+        deleted_at = datetime.now().strftime(REPORT_TIME_FORMAT)
+        get_store().add_report_tombstones(filenames, deleted_at)
+        logging.info(f"[Report] Tombstoned {len(filenames)} report rows")
+    except Exception as e:
+        logging.error(f"[Report] Failed to tombstone {len(filenames)} rows: {e}")
+        return
+    schedule_report_compaction(delay)
+
+
+def remove_from_report_csv(filename):
     """
     Remove a specific file entry from the report.csv file.
     """
-    if not os.path.exists(csv_path):
-        return  # Nothing to update
+    remove_from_report([filename])
+
+
+def schedule_report_compaction(delay: float = COMPACT_DELAY):
+    """
+    (Re)start the compaction timer; repeated deletes push it back. The
+    timer thread is a daemon, so a pending compaction also runs at exit.
+    """
+    global _compaction_timer
+    with _compaction_lock:
+        if _compaction_timer is None:
+            atexit.register(flush_report_compaction)
+        else:
+            _compaction_timer.cancel()
+        _compaction_timer = threading.Timer(delay, compact_report)
+        _compaction_timer.daemon = True
+        _compaction_timer.start()
+
+
+def flush_report_compaction() -> int:
+    """
+    Run a scheduled compaction now instead of waiting for its timer.
+    Returns the number of rows removed.
+    """
+    with _compaction_lock:
+        timer = _compaction_timer
+        if timer is None or not timer.is_alive():
+            return 0
+        timer.cancel()
+    return compact_report()
+
+
+def compact_report(csv_path: str = REPORT_PATH) -> int:
+    """
+    Stream report.csv, drop tombstoned rows and atomically replace the file.
+
+    A row is kept only if it was written strictly after its file's
+    tombstone, so files processed again after a delete keep their new rows.
+    Holds the report writer's lock so no rows are appended mid-rewrite.
+    Returns the number of rows removed.
+    """
+    from memory_store import get_store
 
     try:
-        df = pd.read_csv(csv_path)
-        df = df[df["Filename"] != filename]  # Remove row where filename matches
-        df.to_csv(csv_path, index=False)
-        print(f"[CSV] Removed {filename} from report.")
+        store = get_store()
+        tombstones = store.get_report_tombstones()
+        if not tombstones:
+            return 0
+
+        removed = 0
+        writer = get_report_writer()
+        with writer._lock:
+            writer.close()
+            if os.path.exists(csv_path):
+                tmp_path = csv_path + ".compact"
+                with open(csv_path, newline="", encoding="utf-8") as src, open(
+                    tmp_path, "w", newline="", encoding="utf-8"
+                ) as dst:
+                    out = csv.DictWriter(
+                        dst,
+                        fieldnames=REPORT_FIELDS,
+                        extrasaction="ignore",
+                        lineterminator="\n",
+                    )
+                    out.writeheader()
+                    for row in csv.DictReader(src):
+                        deleted_at = tombstones.get(row.get("filename"))
+                        if deleted_at and (row.get("processed_at") or "") <= deleted_at:
+                            removed += 1
+                            continue
+                        out.writerow(row)
+                os.replace(tmp_path, csv_path)
+
+        store.clear_report_tombstones(tombstones)
+        logging.info(f"[Report] Compacted report: removed {removed} rows")
+        return removed
+
     except Exception as e:
-        print(f"[CSV] Error removing {filename} from report: {e}")
+        logging.error(f"[Report] Compaction failed: {e}")
+        return 0
 
 
 # ------------------ Bulk Scanning ------------------
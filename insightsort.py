@@ -0,0 +1,248 @@
+"""
+Headless command-line entry point for InsightSort.
+
+    python -m insightsort batch <dir> [--workers N] [--dry-run] [--no-move]
+                                      [--changed-only]
+    python -m insightsort search <query> [--limit N] [--page N]
+    python -m insightsort watch [<dir> ...] [--no-move]
+
+Prints one JSON line per document to stdout. Never imports Tkinter.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+
+MANIFEST_BATCH = 500  # Processed files recorded in the scan manifest at a time
+
+# ------------------ Exit Codes ------------------
+
+EXIT_OK = 0  # Every document processed
+EXIT_PARTIAL = 1  # At least one document failed
+EXIT_USAGE = 2  # Bad arguments, missing config or input directory
+EXIT_INTERRUPTED = 130
+
+# ------------------ Batch Command ------------------
+
+
+def collect_files(paths: list) -> list:
+    from file_handler import scan_directory_for_files
+    from utils import is_supported_file
+
+    files = []
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = scan_directory_for_files(path)
+        elif is_supported_file(path):
+            candidates = [path]
+        else:
+            candidates = []
+        for file_path in candidates:
+            if file_path not in seen:
+                seen.add(file_path)
+                files.append(file_path)
+    return files
+
+
+def emit(record: dict):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def run_batch(args) -> int:
+    missing = [p for p in args.paths if not os.path.exists(p)]
+    if missing:
+        print(f"insightsort: no such file or directory: {missing[0]}", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.exists(args.config):
+        print(f"insightsort: config not found: {args.config}", file=sys.stderr)
+        return EXIT_USAGE
+
+    from utils import set_config_path
+
+    set_config_path(args.config)
+
+    from metrics import start_metrics_export, summarize_metrics
+    from pipeline import PipelineExecutor, load_pipeline_settings
+
+    start_metrics_export()
+    settings = load_pipeline_settings()
+    manifest = None
+    if args.changed_only:
+        from scan_manifest import get_scan_manifest
+
+        manifest = get_scan_manifest()
+        files = manifest.scan([p for p in args.paths if os.path.isdir(p)])
+        files += collect_files([p for p in args.paths if not os.path.isdir(p)])
+    else:
+        files = collect_files(args.paths)
+    executor = PipelineExecutor(
+        settings,
+        extract_workers=args.workers,
+        move=not (args.dry_run or args.no_move),
+        store=not args.dry_run,
+    )
+
+    failed = 0
+    processed = []
+    for record in executor.run(files):
+        if record["status"] != "ok":
+            failed += 1
+        emit(record)
+        if manifest and not args.dry_run and "warning" not in record:
+            processed.append((record["file"], record["status"]))
+            if len(processed) >= MANIFEST_BATCH:
+                manifest.mark_processed(processed)
+                processed = []
+    if processed:
+        manifest.mark_processed(processed)
+
+    print(
+        json.dumps({"pipeline": executor.stats(), "metrics": summarize_metrics()}),
+        file=sys.stderr,
+    )
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+# ------------------ Search Command ------------------
+
+
+def run_search(args) -> int:
+    if args.limit < 1 or args.page < 1:
+        print("insightsort: --limit and --page must be positive", file=sys.stderr)
+        return EXIT_USAGE
+
+    from memory_store import get_store
+
+    query = " ".join(args.query)
+    offset = (args.page - 1) * args.limit
+    for result in get_store().search(query, limit=args.limit, offset=offset):
+        emit(result)
+    return EXIT_OK
+
+
+# ------------------ Watch Command ------------------
+
+
+def run_watch(args) -> int:
+    if not os.path.exists(args.config):
+        print(f"insightsort: config not found: {args.config}", file=sys.stderr)
+        return EXIT_USAGE
+
+    from utils import set_config_path
+
+    set_config_path(args.config)
+
+    from metrics import start_metrics_export
+    from watcher import FolderWatcher, load_watch_settings
+
+    start_metrics_export()
+    settings = load_watch_settings()
+    directories = args.paths or settings["directories"]
+    if not directories:
+        print("insightsort: no directories to watch", file=sys.stderr)
+        return EXIT_USAGE
+    missing = [d for d in directories if not os.path.isdir(d)]
+    if missing:
+        print(f"insightsort: no such directory: {missing[0]}", file=sys.stderr)
+        return EXIT_USAGE
+
+    watcher = FolderWatcher(
+        directories, watch_settings=settings, move=not args.no_move, on_record=emit
+    )
+    # Finish the batch in flight on SIGTERM (systemd stop) or Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(timeout=1.0)
+    except KeyboardInterrupt:
+        # The watcher finishes its batch and shuts the extraction pool down;
+        # a second Ctrl+C must not cut that short with a traceback
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        watcher.stop()
+        thread.join()
+        return EXIT_INTERRUPTED
+    return EXIT_OK
+
+
+# ------------------ Argument Parsing ------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="insightsort", description="Classify and organize documents."
+    )
+    parser.add_argument("--config", default="config.yaml", help="path to config.yaml")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch", help="process every supported file under one or more paths"
+    )
+    batch.add_argument("paths", nargs="+", help="directories or files to process")
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="text extraction workers (default: pipeline.extract_workers)",
+    )
+    batch.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="analyze only; do not move files, store metadata or write the report",
+    )
+    batch.add_argument(
+        "--no-move", action="store_true", help="leave files where they are"
+    )
+    batch.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="skip files unchanged since they were last processed (scan manifest)",
+    )
+    batch.set_defaults(handler=run_batch)
+
+    search = commands.add_parser(
+        "search", help="full-text search over processed documents"
+    )
+    search.add_argument("query", nargs="+", help="words to search for")
+    search.add_argument(
+        "--limit", type=int, default=20, help="results per page (default: 20)"
+    )
+    search.add_argument(
+        "--page", type=int, default=1, help="page of results to show (default: 1)"
+    )
+    search.set_defaults(handler=run_search)
+
+    watch = commands.add_parser(
+        "watch", help="process documents as they arrive in drop folders"
+    )
+    watch.add_argument(
+        "paths", nargs="*", help="directories to watch (default: watch.directories)"
+    )
+    watch.add_argument(
+        "--no-move", action="store_true", help="leave files where they are"
+    )
+    watch.set_defaults(handler=run_watch)
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from file_handler import setup_logging
+
+    setup_logging()
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+from memory_store import MemoryStore, get_store
+from utils import clean_text
+
+# ------------------ Config ------------------
+
+N_FEATURES = 2**20  # Hash buckets; bounds the DF table to 8 MB in memory
+
+# ------------------ Keyword Engine ------------------
+
+
+class KeywordEngine:
+    """
+    TF-IDF keywords scored against a corpus-wide document-frequency table.
+
+    Terms are hashed into a fixed number of buckets so memory stays bounded no
+    matter how large the vocabulary grows. The DF table lives in the memory
+    DB and is updated incrementally as documents are stored; each distinct
+    text is counted once, however often it is reprocessed.
+    """
+
+    def __init__(self, store: MemoryStore = None, n_features: int = N_FEATURES):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.store = store or get_store()
+        self.n_features = n_features
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words="english",
+            alternate_sign=False,
+            norm=None,
+        )
+        # Hashes single terms exactly like `vectorizer` hashes document tokens
+        self.term_hasher = HashingVectorizer(
+            n_features=n_features,
+            analyzer=lambda term: [term],
+            alternate_sign=False,
+            norm=None,
+        )
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self._lock = threading.Lock()
+
+        self._init_tables()
+        self._load()
+
+    # ---- Persistence ----
+
+    def _init_tables(self):
+        with self.store.transaction() as cursor:
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS keyword_df (
+                bucket INTEGER PRIMARY KEY,
+                df INTEGER NOT NULL
+            )
+            """
+            )
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS keyword_corpus (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """
+            )
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS keyword_docs (
+                content_hash TEXT PRIMARY KEY
+            )
+            """
+            )
+
+    def _load(self):
+        with self.store.transaction() as cursor:
+            cursor.execute("SELECT value FROM keyword_corpus WHERE name = 'n_features'")
+            row = cursor.fetchone()
+            if row and row[0] != self.n_features:
+                # Bucket layout changed; the old counts are meaningless
+                logging.warning("[Keywords] Hash size changed, resetting DF table")
+                cursor.execute("DELETE FROM keyword_df")
+                cursor.execute("DELETE FROM keyword_corpus")
+                cursor.execute("DELETE FROM keyword_docs")
+
+            cursor.execute("SELECT bucket, df FROM keyword_df")
+            rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+            self.df[rows[:, 0]] = rows[:, 1]
+
+            cursor.execute("SELECT value FROM keyword_corpus WHERE name = 'n_docs'")
+            row = cursor.fetchone()
+            self.n_docs = row[0] if row else 0
+
+    def _unseen_rows(self, hashes: list) -> list:
+        """
+        Indexes of `hashes` not yet counted in the DF table (nor repeated
+        earlier in `hashes`).
+        """
+        rows, seen = [], set()
+        with self.store.transaction() as cursor:
+            for i, content_hash in enumerate(hashes):
+                if content_hash in seen:
+                    continue
+                seen.add(content_hash)
+                cursor.execute(
+                    "SELECT 1 FROM keyword_docs WHERE content_hash = ?",
+                    (content_hash,),
+                )
+                if cursor.fetchone() is None:
+                    rows.append(i)
+        return rows
+
+    def _persist_increment(self, buckets: np.ndarray, counts: np.ndarray, hashes: list):
+        with self.store.transaction() as cursor:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO keyword_docs (content_hash) VALUES (?)",
+                [(content_hash,) for content_hash in hashes],
+            )
+            cursor.executemany(
+                """
+            INSERT INTO keyword_df (bucket, df) VALUES (?, ?)
+            ON CONFLICT(bucket) DO UPDATE SET df = df + excluded.df
+            """,
+                zip(buckets.tolist(), counts.tolist()),
+            )
+            cursor.executemany(
+                """
+            INSERT INTO keyword_corpus (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = excluded.value
+            """,
+                [("n_docs", self.n_docs), ("n_features", self.n_features)],
+            )
+
+    # ---- Scoring ----
+
+    def extract_keywords(self, texts: list, top_n: int = 5, update: bool = False):
+        """
+        Return the top `top_n` keywords for each text, scored in one batch.
+
+        With `update`, texts not seen before are first added to the corpus
+        DF table; leave it off for anything that is not being stored.
+        """
+        texts = [clean_text(text) for text in texts]
+        X = self.vectorizer.transform(texts).tocsr()
+        X.sum_duplicates()
+
+        with self._lock:
+            if update:
+                self._add_to_corpus(X, texts)
+            n_docs = max(self.n_docs, 1)
+            idf = np.log((1 + n_docs) / (1 + self.df[X.indices])) + 1.0
+
+        # Sublinear TF times corpus IDF, in place on the sparse data
+        X.data = (1.0 + np.log(X.data)) * idf
+        top_buckets = self._top_k_per_row(X, top_n)
+
+        bucket_terms = self._bucket_terms(texts)
+        return [
+            [bucket_terms[b] for b in buckets if b in bucket_terms]
+            for buckets in top_buckets
+        ]
+
+    def _add_to_corpus(self, X, texts: list):
+        hashes = [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+        try:
+            rows = self._unseen_rows(hashes)
+        except Exception as e:
+            logging.error(f"[Keywords] Failed to read counted documents: {e}")
+            return
+        if not rows:
+            return
+
+        X = X[rows]
+        buckets, counts = np.unique(X.indices, return_counts=True)
+        self.df[buckets] += counts
+        self.n_docs += X.shape[0]
+        try:
+            self._persist_increment(buckets, counts, [hashes[i] for i in rows])
+        except Exception as e:
+            logging.error(f"[Keywords] Failed to persist DF table: {e}")
+
+    @staticmethod
+    def _top_k_per_row(X, k: int) -> list:
+        """
+        Vectorized top-k over a CSR matrix: sort all non-zeros by (row,
+        -score) once, then keep the first k of each row.
+        """
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        order = np.lexsort((-X.data, rows))
+        rank = np.arange(len(order)) - X.indptr[rows[order]]
+        keep = order[rank < k]
+        kept_rows = rows[keep]
+        kept_buckets = X.indices[keep]
+        splits = np.searchsorted(kept_rows, np.arange(1, X.shape[0]))
+        return [part.tolist() for part in np.split(kept_buckets, splits)]
+
+    def _bucket_terms(self, texts: list) -> dict:
+        """
+        Map hash buckets back to readable terms for the terms in this batch.
+        """
+        terms = list(dict.fromkeys(t for text in texts for t in self.analyzer(text)))
+        if not terms:
+            return {}
+        buckets = self.term_hasher.transform(terms).tocsr().indices
+        bucket_terms = {}
+        for bucket, term in zip(buckets.tolist(), terms):
+            bucket_terms.setdefault(bucket, term)
+        return bucket_terms
+
+
+# ------------------ Shared Instance ------------------
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_keyword_engine() -> KeywordEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = KeywordEngine()
+    return _engine
@@ -0,0 +1,191 @@
+import json
+import logging
+import re
+from llm_cache import cache_get, cache_put, make_cache_key
+from llm_engine import generate, generate_with_shared_prefix
+from llm_classifier import (
+    CLASSIFY_PARAMS,
+    TOPIC_LIST,
+    build_classify_prompt,
+    normalize_topic,
+    parse_classification,
+)
+from extractor import (
+    KEYWORD_PARAMS,
+    KEYWORD_PROMPT,
+    SUMMARY_PARAMS,
+    SUMMARY_PROMPT,
+    parse_keywords,
+)
+from prompts import DOCUMENT_PREFIX, ANALYSIS_SUFFIX, prepare_document_text
+
+# --------------- Prompt Template ------------------
+
+ANALYSIS_PROMPT_TEMPLATE = DOCUMENT_PREFIX + ANALYSIS_SUFFIX
+ANALYSIS_PARAMS = {"stop": ["\n\n\n"], "temperature": 0.2, "max_tokens": 200}
+
+# --------------- Fused Analysis ------------------
+
+
+def analyze_with_llm(document_text: str, top_n: int = 5) -> dict:
+    """
+    Get topic, keywords and summary from a single LLM call.
+
+    Returns a dict with "topic", "keywords" and "summary", where any field the
+    model got wrong is None so the caller can fall back to the per-task
+    functions. Returns None if the response could not be parsed at all.
+    """
+    try:
+        text = prepare_document_text(document_text)
+        cache_key = make_cache_key(
+            "analysis", text, {**ANALYSIS_PARAMS, "top_n": top_n}
+        )
+        cached = cache_get(cache_key)
+        if cached is not None:
+            logging.info(f"[LLM] Analyzed as: {cached['topic']} (cached)")
+            return cached
+
+        prompt = ANALYSIS_PROMPT_TEMPLATE.format(
+            categories=", ".join(TOPIC_LIST), text=text, top_n=top_n
+        )
+
+        output = generate(prompt, **ANALYSIS_PARAMS)
+        raw_response = output["choices"][0]["text"].strip()
+
+        data = parse_json_object(raw_response)
+        if data is None:
+            logging.warning(f"[LLM] Invalid analysis response: '{raw_response}'")
+            return None
+
+        result = {
+            "topic": repair_topic(data.get("topic")),
+            "keywords": repair_keywords(data.get("keywords"), top_n),
+            "summary": repair_summary(data.get("summary")),
+        }
+        logging.info(f"[LLM] Analyzed as: {result['topic']}")
+        if all(value is not None for value in result.values()):
+            cache_put(cache_key, "analysis", result)
+        return result
+
+    except Exception as e:
+        logging.error(f"[LLM] Analysis failed: {e}")
+        return None
+
+
+# --------------- Per-Task Analysis (Shared Prefix) ------------------
+
+
+def analyze_with_shared_prefix(
+    document_text: str, top_n: int = 5, classify: bool = True
+) -> dict:
+    """
+    Run the classify, keyword and summary prompts as separate calls that
+    share one evaluated document prefix in the KV cache.
+
+    Returns a dict with "topic", "keywords", "summary" and "kv_stats"
+    (tokens evaluated / reused and cache hit rate for this document).
+    Without `classify` the topic prompt is skipped and "topic" is None.
+    """
+    try:
+        text = prepare_document_text(document_text)
+        tasks = {
+            "classify": (build_classify_prompt(text), CLASSIFY_PARAMS),
+            "keywords": (KEYWORD_PROMPT.format(text=text), KEYWORD_PARAMS),
+            "summary": (SUMMARY_PROMPT.format(text=text), SUMMARY_PARAMS),
+        }
+        if not classify:
+            del tasks["classify"]
+
+        # Only tasks missing from the result cache go to the model
+        results, cache_keys = {}, {}
+        for task, (_, params) in tasks.items():
+            cache_keys[task] = make_cache_key(task, text, params)
+            cached = cache_get(cache_keys[task])
+            if cached is not None:
+                results[task] = cached
+
+        pending = [task for task in tasks if task not in results]
+        kv_stats = None
+        if pending:
+            outputs, kv_stats = generate_with_shared_prefix(
+                [tasks[task] for task in pending]
+            )
+            for task, output in zip(pending, outputs):
+                response = output["choices"][0]["text"]
+                if task == "classify":
+                    results[task] = parse_classification(response)
+                elif task == "keywords":
+                    results[task] = parse_keywords(response)
+                else:
+                    results[task] = response.strip()
+                if results[task]:
+                    cache_put(cache_keys[task], task, results[task])
+            if "classify" in pending and results["classify"] is None:
+                results["classify"] = "Misc"  # Unparseable; not cached
+
+            logging.info(
+                f"[LLM] Prefix reuse: {kv_stats['evaluated_tokens']} tokens evaluated, "
+                f"{kv_stats['reused_tokens']} reused ({kv_stats['hit_rate']:.0%} hit rate)"
+            )
+
+        return {
+            "topic": results.get("classify"),
+            "keywords": results["keywords"][:top_n],
+            "summary": results["summary"],
+            "kv_stats": kv_stats,
+        }
+
+    except Exception as e:
+        logging.error(f"[LLM] Shared-prefix analysis failed: {e}")
+        return None
+
+
+# --------------- Validation ------------------
+
+
+def parse_json_object(response: str) -> dict:
+    """
+    Pull the first {...} block out of a model response and decode it.
+    """
+    match = re.search(r"\{.*\}", response, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def repair_topic(value) -> str:
+    if not isinstance(value, str):
+        return None
+
+    topic = normalize_topic(value)
+    if topic:
+        return topic
+
+    # Accept answers like "Topic: Finance" or "finance documents"
+    value_clean = value.lower()
+    matches = [t for t in TOPIC_LIST if re.search(rf"\b{t.lower()}\b", value_clean)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def repair_keywords(value, top_n: int = 5) -> list:
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return None
+
+    keywords = []
+    for kw in value:
+        kw = str(kw).strip()
+        if kw and kw.lower() not in (k.lower() for k in keywords):
+            keywords.append(kw)
+    return keywords[:top_n] or None
+
+
+def repair_summary(value) -> str:
+    if not isinstance(value, str):
+        return None
+    return value.strip() or None
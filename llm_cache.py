@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from llm_engine import get_engine_settings
+from memory_store import get_store
+from metrics import record_cache_lookup, record_error
+from prompts import PROMPT_VERSION
+from utils import load_config
+
+# ------------------ Config ------------------
+
+DEFAULT_MAX_ENTRIES = 50000
+EVICTION_CHECK_EVERY = 100  # Puts between size checks
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_puts_since_check = 0
+
+# ------------------ Initialize ------------------
+
+
+@lru_cache(maxsize=None)
+def _cache_settings() -> dict:
+    cache_config = load_config().get("cache") or {}
+    return {
+        "enabled": cache_config.get("enabled", True),
+        "max_entries": int(cache_config.get("max_entries", DEFAULT_MAX_ENTRIES)),
+    }
+
+
+def init_cache():
+    with get_store().transaction() as cursor:
+        cursor.execute(
+            """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            task TEXT,
+            result TEXT,
+            created_at TEXT,
+            last_used REAL
+        )
+        """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)"
+        )
+
+
+@lru_cache(maxsize=None)
+def _ensure_table():
+    # Created on first lookup rather than on import
+    init_cache()
+
+
+# ------------------ Keys ------------------
+
+
+@lru_cache(maxsize=None)
+def _model_path() -> str:
+    return get_engine_settings()["model_path"]
+
+
+def make_cache_key(task: str, text: str, params: dict) -> str:
+    """
+    Content address for an LLM result: the prepared document text plus
+    everything that can change the answer (model, prompt version, sampling).
+    """
+    identity = json.dumps(
+        {
+            "task": task,
+            "model": _model_path(),
+            "prompt_version": PROMPT_VERSION,
+            "params": params,
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256()
+    digest.update(identity.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ------------------ Lookup / Store ------------------
+
+
+def cache_get(key: str):
+    """
+    Return the cached result for `key`, or None on a miss.
+    """
+    if not _cache_settings()["enabled"]:
+        return None
+
+    try:
+        _ensure_table()
+        with get_store().transaction() as cursor:
+            cursor.execute("SELECT result FROM llm_cache WHERE cache_key = ?", (key,))
+            row = cursor.fetchone()
+            if row is not None:
+                cursor.execute(
+                    "UPDATE llm_cache SET last_used = ? WHERE cache_key = ?",
+                    (time.time(), key),
+                )
+        with _lock:
+            _stats["misses" if row is None else "hits"] += 1
+        record_cache_lookup(row is not None)
+        return json.loads(row[0]) if row else None
+    except Exception as e:
+        logging.error(f"[Cache] Lookup failed: {e}")
+        record_error("cache")
+        return None
+
+
+def cache_put(key: str, task: str, result):
+    global _puts_since_check
+
+    settings = _cache_settings()
+    if not settings["enabled"]:
+        return
+
+    try:
+        _ensure_table()
+        with get_store().transaction() as cursor:
+            cursor.execute(
+                """
+            INSERT OR REPLACE INTO llm_cache (cache_key, task, result, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+                (
+                    key,
+                    task,
+                    json.dumps(result),
+                    datetime.now().isoformat(),
+                    time.time(),
+                ),
+            )
+
+            with _lock:
+                _stats["stores"] += 1
+                _puts_since_check += 1
+                check_size = _puts_since_check >= EVICTION_CHECK_EVERY
+                if check_size:
+                    _puts_since_check = 0
+
+            if check_size:
+                _evict(cursor, settings["max_entries"])
+    except Exception as e:
+        logging.error(f"[Cache] Store failed: {e}")
+        record_error("cache")
+
+
+def _evict(cursor, max_entries: int):
+    """
+    Drop least recently used entries until the cache fits `max_entries`.
+    """
+    cursor.execute("SELECT COUNT(*) FROM llm_cache")
+    excess = cursor.fetchone()[0] - max_entries
+    if excess <= 0:
+        return
+
+    cursor.execute(
+        """
+    DELETE FROM llm_cache WHERE cache_key IN (
+        SELECT cache_key FROM llm_cache ORDER BY last_used ASC LIMIT ?
+    )
+    """,
+        (excess,),
+    )
+    with _lock:
+        _stats["evictions"] += excess
+    logging.info(f"[Cache] Evicted {excess} least recently used entries")
+
+
+# ------------------ Stats ------------------
+
+
+def get_cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
@@ -1,10 +1,9 @@
-from llama_cpp import Llama
 import logging
-from utils import clean_text, truncate_text
+from llm_cache import cache_get, cache_put, make_cache_key
+from llm_engine import generate
+from prompts import DOCUMENT_PREFIX, CLASSIFY_SUFFIX, prepare_document_text
 
 # --------------- Config ------------------
-MODEL_PATH = "models/mistral-7b-instruct-v0.1.Q2_K.gguf"
-N_CTX = 2048  # Adjust to available VRAM
 TOPIC_LIST = [
     "Tech",
     "Health",
@@ -16,25 +15,10 @@ TOPIC_LIST = [
     "Misc",
 ]
 
-# --------------- Load LLM ------------------
-try:
-    llm = Llama(model_path=MODEL_PATH, n_ctx=N_CTX, n_threads=8, verbose=False)
-except Exception as e:
-    raise RuntimeError(f"Failed to load LLM: {e}")
-
 # --------------- Prompt Template ------------------
 
-CLASSIFY_PROMPT_TEMPLATE = """
-You are a smart document classifier. Classify the following document into one of the following categories:
-{categories}
-
-Document:
-\"\"\"
-{text}
-\"\"\"
-
-Respond only with the topic name, nothing else.
-"""
+CLASSIFY_PROMPT_TEMPLATE = DOCUMENT_PREFIX + CLASSIFY_SUFFIX
+CLASSIFY_PARAMS = {"stop": ["\n", "\n\n"], "temperature": 0.2, "max_tokens": 10}
 
 # --------------- Main Classifier ------------------
 
@@ -42,26 +26,28 @@ Respond only with the topic name, nothing else.
 def classify_with_llm(document_text: str) -> str:
     try:
         # Step 1: Clean & truncate long content
-        text = truncate_text(clean_text(document_text), max_words=500)
+        text = prepare_document_text(document_text)
 
-        # Step 2: Format prompt
-        prompt = CLASSIFY_PROMPT_TEMPLATE.format(
-            categories=", ".join(TOPIC_LIST), text=text
-        )
+        # Step 2: Check the result cache
+        cache_key = make_cache_key("classify", text, CLASSIFY_PARAMS)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            logging.info(f"[LLM] Classified as: {cached} (cached)")
+            return cached
 
-        # Step 3: Run LLM
-        output = llm(prompt, stop=["\n", "\n\n"], temperature=0.2, max_tokens=10)
-        raw_response = output["choices"][0]["text"].strip()
+        # Step 3: Format prompt
+        prompt = build_classify_prompt(text)
 
-        # Step 4: Post-process result
-        topic = normalize_topic(raw_response)
+        # Step 4: Run LLM
+        output = generate(prompt, **CLASSIFY_PARAMS)
 
-        if topic:
-            logging.info(f"[LLM] Classified as: {topic}")
-            return topic
-        else:
-            logging.warning(f"[LLM] Invalid response: '{raw_response}'")
+        # Step 5: Post-process result
+        # Only a real answer is cached; an unparseable one is retried next time
+        topic = parse_classification(output["choices"][0]["text"])
+        if topic is None:
             return "Misc"
+        cache_put(cache_key, "classify", topic)
+        return topic
 
     except Exception as e:
         logging.error(f"[LLM] Classification failed: {e}")
@@ -71,6 +57,25 @@ def classify_with_llm(document_text: str) -> str:
 # --------------- Utilities ------------------
 
 
+def build_classify_prompt(text: str) -> str:
+    return CLASSIFY_PROMPT_TEMPLATE.format(categories=", ".join(TOPIC_LIST), text=text)
+
+
+def parse_classification(response: str) -> str:
+    """
+    The topic named by a model response, or None if it names none.
+    """
+    raw_response = response.strip()
+    topic = normalize_topic(raw_response)
+
+    if topic:
+        logging.info(f"[LLM] Classified as: {topic}")
+        return topic
+    else:
+        logging.warning(f"[LLM] Invalid response: '{raw_response}'")
+        return None
+
+
 def normalize_topic(response: str) -> str:
     response_clean = response.strip().lower()
     for topic in TOPIC_LIST:
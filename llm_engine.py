@@ -0,0 +1,253 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from metrics import observe_llm
+from utils import load_config
+
+if TYPE_CHECKING:
+    from llama_cpp import Llama  # Imported on first load; it takes a while
+
+# --------------- Config ------------------
+
+DEFAULT_MODEL_PATH = "models/mistral-7b-instruct-v0.1.Q2_K.gguf"
+DEFAULT_N_CTX = 2048
+DEFAULT_N_THREADS = 8
+
+# --------------- Shared Engine ------------------
+
+_llm = None
+_load_error = None
+_load_lock = threading.Lock()
+
+# A llama_cpp context holds a single KV cache, so calls must be serialized.
+LLM_LOCK = threading.RLock()
+
+
+def get_engine_settings() -> dict:
+    """
+    Resolve model path, context size and thread count from config.yaml.
+    """
+    config = load_config()
+    llm_config = config.get("llm") or {}
+    return {
+        "model_path": config.get("model_path", DEFAULT_MODEL_PATH),
+        "n_ctx": int(llm_config.get("context_window", DEFAULT_N_CTX)),
+        "n_threads": int(llm_config.get("threads", DEFAULT_N_THREADS)),
+        "embedding_model_path": llm_config.get("embedding_model"),
+    }
+
+
+def get_llm() -> "Llama":
+    """
+    Return the process-wide model instance, loading it on first use.
+    """
+    global _llm, _load_error
+
+    if _llm is not None:
+        return _llm
+
+    with _load_lock:
+        if _llm is None:
+            if _load_error is not None:
+                raise RuntimeError(f"Failed to load LLM: {_load_error}")
+
+            settings = get_engine_settings()
+            try:
+                from llama_cpp import Llama
+
+                _llm = Llama(
+                    model_path=settings["model_path"],
+                    n_ctx=settings["n_ctx"],
+                    n_threads=settings["n_threads"],
+                    verbose=False,
+                )
+            except Exception as e:
+                _load_error = e
+                raise RuntimeError(f"Failed to load LLM: {e}")
+
+            logging.info(f"[LLM] Loaded model: {settings['model_path']}")
+    return _llm
+
+
+def warm_up(on_done=None) -> threading.Thread:
+    """
+    Load the model in a background thread so the first document does not
+    pay for it. `on_done(error, seconds)` is called from that thread, with
+    error None on success.
+    """
+
+    def load():
+        start = time.perf_counter()
+        error = None
+        try:
+            get_llm()
+        except Exception as e:
+            logging.error(f"[LLM] Warm-up failed: {e}")
+            error = e
+        if on_done:
+            on_done(error, time.perf_counter() - start)
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def set_llm(llm):
+    """
+    Use `llm` as the shared model instead of loading one from config (e.g. a
+    stand-in with the same interface for benchmarks).
+    """
+    global _llm, _load_error
+    with _load_lock:
+        _llm = llm
+        _load_error = None
+
+
+def generate(prompt: str, **params) -> dict:
+    """
+    Run a completion on the shared model. Safe to call from any thread.
+    """
+    llm = get_llm()
+    with LLM_LOCK:
+        return _complete(llm, prompt, params)
+
+
+def _complete(llm, prompt: str, params: dict) -> dict:
+    """
+    One completion, recorded in the metrics registry with its token usage.
+    """
+    start = time.perf_counter()
+    try:
+        output = llm(prompt, **params)
+    except Exception:
+        observe_llm("complete", time.perf_counter() - start, error=True)
+        raise
+    usage = output.get("usage") or {}
+    observe_llm(
+        "complete",
+        time.perf_counter() - start,
+        usage.get("prompt_tokens", 0),
+        usage.get("completion_tokens", 0),
+    )
+    return output
+
+
+# --------------- Embeddings ------------------
+
+_embedder = None
+_embedder_error = None
+_embedder_lock = threading.Lock()
+EMBED_LOCK = threading.Lock()
+
+
+def get_embedder() -> "Llama":
+    """
+    Return the embedding model (llm.embedding_model), loading it on first use.
+
+    Embeddings need a context created with embedding=True, so this is a
+    separate instance from the generation model.
+    """
+    global _embedder, _embedder_error
+
+    if _embedder is not None:
+        return _embedder
+
+    with _embedder_lock:
+        if _embedder is None:
+            if _embedder_error is not None:
+                raise RuntimeError(f"Failed to load embedding model: {_embedder_error}")
+
+            settings = get_engine_settings()
+            if not settings["embedding_model_path"]:
+                raise RuntimeError(
+                    "No embedding model configured (llm.embedding_model)"
+                )
+            try:
+                from llama_cpp import Llama
+
+                _embedder = Llama(
+                    model_path=settings["embedding_model_path"],
+                    n_ctx=settings["n_ctx"],
+                    n_threads=settings["n_threads"],
+                    embedding=True,
+                    verbose=False,
+                )
+            except Exception as e:
+                _embedder_error = e
+                raise RuntimeError(f"Failed to load embedding model: {e}")
+
+            logging.info(
+                f"[LLM] Loaded embedding model: {settings['embedding_model_path']}"
+            )
+    return _embedder
+
+
+def set_embedder(model):
+    """
+    Use `model` as the embedding model instead of loading one from config.
+    """
+    global _embedder, _embedder_error
+    with _embedder_lock:
+        _embedder = model
+        _embedder_error = None
+
+
+def embed(texts: list) -> list:
+    """
+    One embedding vector per text: a single forward pass each, no decoding.
+    """
+    model = get_embedder()
+    start = time.perf_counter()
+    with EMBED_LOCK:
+        vectors = [model.embed(text) for text in texts]
+    observe_llm("embed", time.perf_counter() - start)
+    return vectors
+
+
+# --------------- Prefix Reuse ------------------
+
+
+def generate_with_shared_prefix(calls: list) -> tuple:
+    """
+    Run several completions whose prompts start with the same document prefix.
+
+    `calls` is a list of (prompt, params). The calls run back to back under the
+    engine lock, so each one finds the previous prompt's tokens still in the KV
+    cache and llama_cpp only evaluates the part after the longest common token
+    prefix. Returns (outputs, stats) where stats counts prompt tokens, tokens
+    actually evaluated and tokens served from the cache.
+    """
+    llm = get_llm()
+    outputs = []
+    stats = {"prompt_tokens": 0, "evaluated_tokens": 0, "reused_tokens": 0}
+
+    with LLM_LOCK:
+        for prompt, params in calls:
+            prompt_tokens = llm.tokenize(prompt.encode("utf-8"))
+            cached_tokens = list(llm.input_ids[: llm.n_tokens])
+            # llama_cpp always re-evaluates the last prompt token for logits
+            reused = _common_prefix_length(cached_tokens, prompt_tokens[:-1])
+
+            outputs.append(_complete(llm, prompt, params))
+
+            stats["prompt_tokens"] += len(prompt_tokens)
+            stats["reused_tokens"] += reused
+            stats["evaluated_tokens"] += len(prompt_tokens) - reused
+
+    stats["hit_rate"] = (
+        stats["reused_tokens"] / stats["prompt_tokens"]
+        if stats["prompt_tokens"]
+        else 0.0
+    )
+    return outputs, stats
+
+
+def _common_prefix_length(a: list, b: list) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
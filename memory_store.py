@@ -1,20 +1,40 @@
 import sqlite3
 import os
 import logging
+import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_PATH = "output/insight_memory.db"
 
-# ------------------ Initialize ------------------
+# ------------------ Schema Migrations ------------------
 
 
-def init_db():
-    os.makedirs("output", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def _add_body_column(conn: sqlite3.Connection) -> str:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(file_memory)")}
+    return "" if "body" in columns else "ALTER TABLE file_memory ADD COLUMN body TEXT;"
 
-    cursor.execute(
-        """
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """
+    Whether this SQLite build has the FTS5 extension.
+    """
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+# Each entry upgrades the schema by one version (tracked in PRAGMA
+# user_version) and runs in one transaction with the version bump. An
+# entry is a SQL script or a function returning one. Only ever append;
+# never edit a migration that has shipped.
+MIGRATIONS = [
+    # 1: original table
+    """
     CREATE TABLE IF NOT EXISTS file_memory (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         filename TEXT,
@@ -22,53 +42,371 @@ def init_db():
         keywords TEXT,
         summary TEXT,
         processed_at TEXT
-    )
+    );
+    """,
+    # 2: indexes for lookups by filename / topic and history queries
+    """
+    CREATE INDEX IF NOT EXISTS idx_file_memory_filename ON file_memory (filename);
+    CREATE INDEX IF NOT EXISTS idx_file_memory_topic ON file_memory (topic, processed_at);
+    CREATE INDEX IF NOT EXISTS idx_file_memory_processed_at ON file_memory (processed_at);
+    """,
+    # 3: report.csv rows deleted but not yet compacted out of the file
+    """
+    CREATE TABLE IF NOT EXISTS report_tombstones (
+        filename TEXT PRIMARY KEY,
+        deleted_at TEXT NOT NULL
+    );
+    """,
+    # 4: optional extracted text, stored only for search
+    _add_body_column,
+    # 5: full-text index kept in sync by triggers (needs FTS5)
     """
-    )
+    CREATE VIRTUAL TABLE IF NOT EXISTS file_memory_fts USING fts5(
+        filename, keywords, summary, body,
+        content='file_memory', content_rowid='id', tokenize='porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS file_memory_fts_insert AFTER INSERT ON file_memory BEGIN
+        INSERT INTO file_memory_fts (rowid, filename, keywords, summary, body)
+        VALUES (new.id, new.filename, new.keywords, new.summary, new.body);
+    END;
+    CREATE TRIGGER IF NOT EXISTS file_memory_fts_delete AFTER DELETE ON file_memory BEGIN
+        INSERT INTO file_memory_fts (file_memory_fts, rowid, filename, keywords, summary, body)
+        VALUES ('delete', old.id, old.filename, old.keywords, old.summary, old.body);
+    END;
+    CREATE TRIGGER IF NOT EXISTS file_memory_fts_update AFTER UPDATE ON file_memory BEGIN
+        INSERT INTO file_memory_fts (file_memory_fts, rowid, filename, keywords, summary, body)
+        VALUES ('delete', old.id, old.filename, old.keywords, old.summary, old.body);
+        INSERT INTO file_memory_fts (rowid, filename, keywords, summary, body)
+        VALUES (new.id, new.filename, new.keywords, new.summary, new.body);
+    END;
+    INSERT INTO file_memory_fts (file_memory_fts) VALUES ('rebuild');
+    """,
+]
+FTS_VERSION = 5  # Migrations from here on are skipped without FTS5
 
-    conn.commit()
-    conn.close()
+# Column weights for search ranking: filename, keywords, summary, body
+SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
 
+# ------------------ Store ------------------
 
-# ------------------ Insert Record ------------------
 
+class MemoryStore:
+    """
+    Access to the insight memory DB over persistent per-thread connections.
 
-def store_file_metadata(filename, topic, keywords, summary):
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
+    SQLite connections cannot be shared across threads, so each thread gets
+    its own connection on first use and keeps it. The DB runs in WAL mode so
+    the pipeline writer and GUI readers do not block each other.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._migrate_lock = threading.Lock()
+        self._migrated = False
+        self.has_fts = False
+
+    # ---- Connections ----
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._migrated:
+            self._migrate(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Commit on success, roll back on error.
+        """
+        conn = self.connection()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def close(self):
+        """
+        Close the calling thread's connection.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def migrate(self):
+        """
+        Bring the schema up to date (runs once per store).
+        """
+        self.connection()
+
+    def _migrate(self, conn: sqlite3.Connection):
+        with self._migrate_lock:
+            if self._migrated:
+                return
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                self._apply_migrations(conn, version)
+            finally:
+                # Also after a failure, so it is not retried on every connection
+                self._migrated = True
+
+    def _apply_migrations(self, conn: sqlite3.Connection, version: int):
+        """
+        Run each pending migration and its version bump in one transaction,
+        stopping at the first failure (rolled back, so it can be retried on
+        the next start).
+        """
+        fts = fts5_available(conn)
+        for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+            if number >= FTS_VERSION and not fts:
+                logging.warning(
+                    "[Memory] SQLite has no FTS5; full-text search is disabled"
+                )
+                break
+            try:
+                script = migration(conn) if callable(migration) else migration
+                conn.executescript(
+                    f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;"
+                )
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                logging.error(f"[Memory] Migration to version {number} failed: {e}")
+                break
+            logging.info(f"[Memory] Migrated schema to version {number}")
+            version = number
+        self.has_fts = version >= FTS_VERSION
+
+    # ---- Insert ----
+
+    def store_file_metadata(self, filename, topic, keywords, summary, body=None):
+        self.store_many([(filename, topic, keywords, summary, body)])
+
+    def store_many(self, records):
+        """
+        Insert many (filename, topic, keywords, summary[, body]) rows in one
+        transaction. `body` is the extracted text, stored only for search.
+        """
+        now = datetime.now().isoformat()
+        with self.transaction() as cursor:
+            cursor.executemany(
+                """
+            INSERT INTO file_memory (filename, topic, keywords, summary, body, processed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        filename,
+                        topic,
+                        ", ".join(keywords),
+                        summary,
+                        body[0] if body else None,
+                        now,
+                    )
+                    for filename, topic, keywords, summary, *body in records
+                ],
+            )
+
+    # ---- Queries ----
+
+    def get_files_by_topic(self, topic):
+        cursor = self.connection().execute(
             """
-        INSERT INTO file_memory (filename, topic, keywords, summary, processed_at)
-        VALUES (?, ?, ?, ?, ?)
+        SELECT filename, keywords, summary, processed_at
+        FROM file_memory
+        WHERE topic = ?
+        ORDER BY processed_at DESC
         """,
-            (filename, topic, ", ".join(keywords), summary, datetime.now().isoformat()),
+            (topic,),
+        )
+        return cursor.fetchall()
+
+    def get_topic_counts(self):
+        cursor = self.connection().execute(
+            """
+        SELECT topic, COUNT(*) as count
+        FROM file_memory
+        GROUP BY topic
+        ORDER BY count DESC
+        """
         )
-        conn.commit()
-        conn.close()
+        return cursor.fetchall()
+
+    def get_processing_history(self, limit=10):
+        cursor = self.connection().execute(
+            """
+        SELECT filename, topic, keywords, summary, processed_at
+        FROM file_memory
+        ORDER BY processed_at DESC
+        LIMIT ?
+        """,
+            (limit,),
+        )
+        return cursor.fetchall()
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> list:
+        """
+        Full-text search, best matches first (BM25). Always empty when
+        SQLite has no FTS5.
+
+        Returns dicts with filename, topic, processed_at, a highlighted
+        snippet and the rank score.
+        """
+        match = fts_query(query)
+        conn = self.connection()  # Migrates first, which sets has_fts
+        if not match or not self.has_fts:
+            return []
+        cursor = conn.execute(
+            f"""
+        SELECT m.filename, m.topic, m.processed_at,
+               snippet(file_memory_fts, -1, '[', ']', '…', 12),
+               bm25(file_memory_fts, {", ".join(map(str, SEARCH_WEIGHTS))}) AS rank
+        FROM file_memory_fts
+        JOIN file_memory m ON m.id = file_memory_fts.rowid
+        WHERE file_memory_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+        """,
+            (match, limit, offset),
+        )
+        return [
+            {
+                "filename": filename,
+                "topic": topic,
+                "processed_at": processed_at,
+                "snippet": snippet,
+                "rank": rank,
+            }
+            for filename, topic, processed_at, snippet, rank in cursor.fetchall()
+        ]
+
+    # ---- Delete ----
+
+    def delete_files(self, filenames) -> int:
+        """
+        Delete every row for the given filenames in one transaction.
+        """
+        with self.transaction() as cursor:
+            cursor.executemany(
+                "DELETE FROM file_memory WHERE filename = ?",
+                [(filename,) for filename in filenames],
+            )
+            return cursor.rowcount
+
+    # ---- Report Tombstones ----
+
+    def add_report_tombstones(self, filenames, deleted_at: str):
+        """
+        Mark report rows for `filenames` written up to `deleted_at` as deleted.
+        """
+        with self.transaction() as cursor:
+            cursor.executemany(
+                """
+            INSERT INTO report_tombstones (filename, deleted_at) VALUES (?, ?)
+            ON CONFLICT(filename) DO UPDATE SET deleted_at = excluded.deleted_at
+            """,
+                [(filename, deleted_at) for filename in filenames],
+            )
+
+    def get_report_tombstones(self) -> dict:
+        cursor = self.connection().execute(
+            "SELECT filename, deleted_at FROM report_tombstones"
+        )
+        return dict(cursor.fetchall())
+
+    def clear_report_tombstones(self, tombstones: dict):
+        """
+        Drop tombstones once compacted, unless they were renewed meanwhile.
+        """
+        with self.transaction() as cursor:
+            cursor.executemany(
+                "DELETE FROM report_tombstones WHERE filename = ? AND deleted_at = ?",
+                tombstones.items(),
+            )
+
+
+def fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix.
+
+    Quoting each word keeps user input from being parsed as FTS syntax.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MemoryStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MemoryStore()
+    return _store
+
+
+# ------------------ Initialize ------------------
+
+
+def init_db():
+    """
+    Create / upgrade the schema now. Optional: the store migrates on its
+    first connection anyway.
+    """
+    get_store().migrate()
+
+
+# ------------------ Insert Record ------------------
+
+
+def store_file_metadata(filename, topic, keywords, summary, body=None):
+    try:
+        get_store().store_file_metadata(filename, topic, keywords, summary, body)
         logging.info(f"[Memory] Stored metadata for: {filename}")
     except Exception as e:
         logging.error(f"[Memory] Failed to store: {filename} → {e}")
 
 
+def store_many_metadata(records) -> bool:
+    """
+    Insert many (filename, topic, keywords, summary[, body]) rows in one
+    transaction. Returns False if the batch could not be written.
+    """
+    try:
+        get_store().store_many(records)
+        logging.info(f"[Memory] Stored metadata for {len(records)} files")
+        return True
+    except Exception as e:
+        logging.error(f"[Memory] Failed to store {len(records)} files → {e}")
+        return False
+
+
 # ------------------ Fetch by Topic ------------------
 
 
 def get_files_by_topic(topic):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-    SELECT filename, keywords, summary, processed_at
-    FROM file_memory
-    WHERE topic = ?
-    ORDER BY processed_at DESC
-    """,
-        (topic,),
-    )
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return get_store().get_files_by_topic(topic)
+
+
+# ------------------ Search ------------------
+
+
+def search_files(query, limit=20, offset=0):
+    try:
+        return get_store().search(query, limit, offset)
+    except Exception as e:
+        logging.error(f"[Memory] Search failed for '{query}': {e}")
+        return []
 
 
 # ------------------ Topic Delete   ------------------
@@ -76,60 +414,44 @@ def get_files_by_topic(topic):
 
 def delete_file_metadata(filename):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM file_memory WHERE filename = ?", (filename,))
-        conn.commit()
-        conn.close()
+        get_store().delete_files([filename])
         logging.info(f"[Memory] Deleted metadata for: {filename}")
     except Exception as e:
         logging.error(f"[Memory] Failed to delete metadata for {filename}: {e}")
 
 
-def delete_files_by_folder(folder_path):
+def delete_files_metadata(filenames) -> int:
     """
-    Deletes all DB entries for files found in a given folder.
+    Delete DB entries for many files at once. Returns the number of rows removed.
     """
+    filenames = list(filenames)
     try:
-        filenames = [
-            f
-            for f in os.listdir(folder_path)
-            if os.path.isfile(os.path.join(folder_path, f))
-        ]
+        deleted = get_store().delete_files(filenames)
+        logging.info(f"[Memory] Deleted metadata for {len(filenames)} files")
+        return deleted
+    except Exception as e:
+        logging.error(
+            f"[Memory] Failed to delete metadata for {len(filenames)} files: {e}"
+        )
+        return 0
 
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        for filename in filenames:
-            cursor.execute("DELETE FROM file_memory WHERE filename = ?", (filename,))
-            logging.info(f"[Memory] Deleted metadata for: {filename}")
-        conn.commit()
-        conn.close()
 
+def delete_files_by_folder(folder_path):
+    """
+    Deletes all DB entries for files found in a given folder.
+    """
+    try:
+        filenames = [entry.name for entry in os.scandir(folder_path) if entry.is_file()]
     except Exception as e:
         logging.error(
             f"[Memory] Failed to delete metadata from folder {folder_path}: {e}"
         )
+        return 0
+    return delete_files_metadata(filenames)
 
 
 # ------------------ Topic Frequency ------------------
 
 
 def get_topic_counts():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-    SELECT topic, COUNT(*) as count
-    FROM file_memory
-    GROUP BY topic
-    ORDER BY count DESC
-    """
-    )
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
-
-
-# ------------------ On Import ------------------
-
-init_db()
+    return get_store().get_topic_counts()
@@ -0,0 +1,498 @@
+import atexit
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+from utils import load_config
+
+# ------------------ Config ------------------
+
+PREFIX = "insightsort_"
+# Seconds; wide enough for sub-millisecond DB writes and minute-long LLM calls
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+def load_metrics_settings(config: dict = None) -> dict:
+    if config is None:
+        config = load_config()
+    metrics = config.get("metrics") or {}
+    return {
+        "textfile": metrics.get("textfile", os.path.join("output", "metrics.prom")),
+        "interval": float(metrics.get("interval", 15.0)),
+        "http_host": metrics.get("http_host", "127.0.0.1"),
+        "http_port": metrics.get("http_port"),
+    }
+
+
+# ------------------ Metric Types ------------------
+
+
+class Counter:
+    """Monotonic count for one label set."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"value": self.value}
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram for one label set: per-bucket counts, total
+    count and sum, as in Prometheus.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # Last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        return {
+            "count": count,
+            "sum": total,
+            "bounds": list(self.bounds),
+            "buckets": counts,
+            "p50": bucket_quantile(self.bounds, counts, 0.50),
+            "p95": bucket_quantile(self.bounds, counts, 0.95),
+        }
+
+
+def bucket_quantile(bounds: tuple, counts: list, q: float) -> float:
+    """
+    Estimate a quantile from (non-cumulative) bucket counts by linear
+    interpolation inside the bucket it falls in, like histogram_quantile().
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, n in enumerate(counts):
+        if seen + n >= rank and n:
+            if i == len(bounds):  # +Inf bucket: best we can say is the top bound
+                return bounds[-1]
+            lower = bounds[i - 1] if i else 0.0
+            return lower + (bounds[i] - lower) * (rank - seen) / n
+        seen += n
+    return bounds[-1]
+
+
+# ------------------ Registry ------------------
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms, each keyed by a sorted label set.
+
+    Everything that reports metrics (pipeline stages, the LLM engine, the
+    result cache) writes here; the Prometheus text file, the JSON endpoint
+    and the GUI stats panel all read from it.
+    """
+
+    def __init__(self):
+        self._metrics = {}  # name -> {"type", "help", "series": {labels: metric}}
+        self._lock = threading.Lock()
+
+    def _series(self, kind: str, name: str, help_text: str, labels: dict, factory):
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            family = self._metrics.setdefault(
+                name, {"type": kind, "help": help_text, "series": {}}
+            )
+            metric = family["series"].get(key)
+            if metric is None:
+                metric = family["series"][key] = factory()
+        return metric
+
+    def counter(self, name: str, help_text: str = "", **labels) -> Counter:
+        return self._series("counter", name, help_text, labels, Counter)
+
+    def histogram(
+        self, name: str, help_text: str = "", buckets: tuple = LATENCY_BUCKETS, **labels
+    ) -> Histogram:
+        return self._series(
+            "histogram", name, help_text, labels, lambda: Histogram(buckets)
+        )
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    # ---- Export ----
+
+    def snapshot(self) -> dict:
+        """
+        {name: {"type", "help", "series": [{"labels", ...values}]}}
+        """
+        with self._lock:
+            families = {
+                name: (family["type"], family["help"], list(family["series"].items()))
+                for name, family in self._metrics.items()
+            }
+        return {
+            name: {
+                "type": kind,
+                "help": help_text,
+                "series": [
+                    {"labels": dict(key), **metric.snapshot()} for key, metric in series
+                ],
+            }
+            for name, (kind, help_text, series) in sorted(families.items())
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        with self._lock:
+            families = sorted(
+                (name, family["type"], family["help"], list(family["series"].items()))
+                for name, family in self._metrics.items()
+            )
+        for name, kind, help_text, series in families:
+            full = PREFIX + name
+            if help_text:
+                lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for key, metric in series:
+                if kind == "counter":
+                    lines.append(
+                        f"{full}{_labels(key)} {_number(metric.snapshot()['value'])}"
+                    )
+                    continue
+                snap = metric.snapshot()
+                cumulative = 0
+                for bound, n in zip(metric.bounds + (math.inf,), snap["buckets"]):
+                    cumulative += n
+                    le = "+Inf" if bound == math.inf else _number(bound)
+                    lines.append(
+                        f"{full}_bucket{_labels(key + (('le', le),))} {cumulative}"
+                    )
+                lines.append(f"{full}_sum{_labels(key)} {_number(snap['sum'])}")
+                lines.append(f"{full}_count{_labels(key)} {snap['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """
+        Write the text format atomically, for node_exporter's textfile
+        collector or any scraper that reads files.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _labels(key: tuple) -> str:
+    if not key:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in key
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+    return _registry
+
+
+# ------------------ Recording Helpers ------------------
+
+
+def observe_stage(stage: str, seconds: float, error: bool = False):
+    """
+    One item through a pipeline stage: extract (parsing), analyze
+    (inference), write, and its disk steps move / store / report.
+    """
+    registry = get_registry()
+    registry.histogram(
+        "stage_seconds", "Time spent per item in each pipeline stage", stage=stage
+    ).observe(seconds)
+    registry.counter("stage_items_total", "Items through each stage", stage=stage).inc()
+    if error:
+        record_error(stage)
+
+
+def observe_document(seconds: float, ok: bool = True):
+    registry = get_registry()
+    registry.counter(
+        "documents_total", "Documents processed", status="ok" if ok else "error"
+    ).inc()
+    registry.histogram(
+        "document_seconds", "End-to-end processing time per document"
+    ).observe(seconds)
+
+
+def observe_llm(
+    kind: str,
+    seconds: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    error: bool = False,
+):
+    """
+    One model call (complete, score or embed) with its token usage.
+    """
+    registry = get_registry()
+    registry.counter("llm_requests_total", "LLM calls", kind=kind).inc()
+    registry.histogram("llm_seconds", "Duration of LLM calls", kind=kind).observe(
+        seconds
+    )
+    registry.counter(
+        "llm_prompt_tokens_total", "Prompt tokens sent to the LLM", kind=kind
+    ).inc(prompt_tokens)
+    registry.counter(
+        "llm_completion_tokens_total", "Tokens generated by the LLM", kind=kind
+    ).inc(completion_tokens)
+    if error:
+        record_error("llm")
+
+
+def record_cache_lookup(hit: bool):
+    get_registry().counter(
+        "cache_lookups_total",
+        "LLM result cache lookups",
+        result="hit" if hit else "miss",
+    ).inc()
+
+
+def record_error(component: str):
+    get_registry().counter(
+        "errors_total", "Errors by component", component=component
+    ).inc()
+
+
+# ------------------ Summaries ------------------
+
+
+def diff_snapshots(now: dict, before: dict) -> dict:
+    """
+    What was recorded between two snapshots (e.g. since a view was reset).
+    """
+    previous = {
+        (name, tuple(sorted(s["labels"].items()))): s
+        for name, family in before.items()
+        for s in family["series"]
+    }
+    diff = {}
+    for name, family in now.items():
+        series = []
+        for s in family["series"]:
+            old = previous.get((name, tuple(sorted(s["labels"].items()))))
+            if old is None:
+                series.append(s)
+            elif family["type"] == "counter":
+                series.append({**s, "value": s["value"] - old["value"]})
+            else:
+                buckets = [a - b for a, b in zip(s["buckets"], old["buckets"])]
+                series.append(
+                    {
+                        **s,
+                        "count": s["count"] - old["count"],
+                        "sum": s["sum"] - old["sum"],
+                        "buckets": buckets,
+                        "p50": bucket_quantile(s["bounds"], buckets, 0.50),
+                        "p95": bucket_quantile(s["bounds"], buckets, 0.95),
+                    }
+                )
+        diff[name] = {**family, "series": series}
+    return diff
+
+
+def _series_total(snapshot: dict, name: str, field: str = "value", **labels) -> float:
+    family = snapshot.get(name) or {}
+    return sum(
+        s[field]
+        for s in family.get("series", [])
+        if all(s["labels"].get(k) == v for k, v in labels.items())
+    )
+
+
+def summarize_metrics(snapshot: dict = None) -> dict:
+    """
+    Headline numbers from a registry snapshot: documents, success rate,
+    per-stage p50/p95, LLM tokens/sec and cache hit rate.
+    """
+    snapshot = snapshot if snapshot is not None else get_registry().snapshot()
+    ok = _series_total(snapshot, "documents_total", status="ok")
+    failed = _series_total(snapshot, "documents_total", status="error")
+    docs_seconds = _series_total(snapshot, "document_seconds", "sum")
+    docs_count = _series_total(snapshot, "document_seconds", "count")
+
+    stages = {
+        s["labels"]["stage"]: {
+            "count": s["count"],
+            "mean": s["sum"] / s["count"] if s["count"] else 0.0,
+            "p50": s["p50"],
+            "p95": s["p95"],
+        }
+        for s in (snapshot.get("stage_seconds") or {}).get("series", [])
+    }
+
+    llm_seconds = _series_total(snapshot, "llm_seconds", "sum", kind="complete")
+    completion = _series_total(snapshot, "llm_completion_tokens_total")
+    hits = _series_total(snapshot, "cache_lookups_total", result="hit")
+    misses = _series_total(snapshot, "cache_lookups_total", result="miss")
+    return {
+        "documents": int(ok + failed),
+        "successful": int(ok),
+        "success_rate": ok / (ok + failed) if ok + failed else 0.0,
+        "avg_document_seconds": docs_seconds / docs_count if docs_count else 0.0,
+        "stages": stages,
+        "llm_requests": int(_series_total(snapshot, "llm_requests_total")),
+        "llm_prompt_tokens": int(_series_total(snapshot, "llm_prompt_tokens_total")),
+        "llm_completion_tokens": int(completion),
+        "llm_tokens_per_sec": completion / llm_seconds if llm_seconds else 0.0,
+        "cache_hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "errors": {
+            s["labels"]["component"]: int(s["value"])
+            for s in (snapshot.get("errors_total") or {}).get("series", [])
+        },
+    }
+
+
+# ------------------ Export ------------------
+
+
+# http.server is only imported when the endpoint is enabled
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            registry = get_registry()
+            if self.path.startswith("/metrics.json") or self.path == "/":
+                snapshot = registry.snapshot()
+                body = json.dumps(
+                    {"summary": summarize_metrics(snapshot), "metrics": snapshot}
+                )
+                content_type = "application/json"
+            elif self.path.startswith("/metrics"):
+                body = registry.to_prometheus()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the process log
+
+    return MetricsHandler
+
+
+def serve_metrics(host: str = "127.0.0.1", port: int = 9464):
+    """
+    Serve GET /metrics (Prometheus text) and GET /metrics.json (snapshot
+    plus summary) from a daemon thread. Returns the server.
+    """
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"[Metrics] Serving on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+_export_started = False
+_export_lock = threading.Lock()
+
+
+def start_metrics_export(settings: dict = None):
+    """
+    Rewrite the Prometheus text file every `interval` seconds (and at exit)
+    and start the HTTP endpoint if a port is configured. Safe to call more
+    than once.
+    """
+    global _export_started
+    with _export_lock:
+        if _export_started:
+            return
+        _export_started = True
+
+    settings = settings or load_metrics_settings()
+    registry = get_registry()
+
+    if settings["textfile"]:
+
+        def write():
+            try:
+                registry.write_prometheus(settings["textfile"])
+            except Exception as e:
+                logging.error(f"[Metrics] Failed to write {settings['textfile']}: {e}")
+
+        def write_periodically():
+            while True:
+                time.sleep(settings["interval"])
+                write()
+
+        threading.Thread(target=write_periodically, daemon=True).start()
+        atexit.register(write)
+
+    if settings["http_port"]:
+        try:
+            serve_metrics(settings["http_host"], int(settings["http_port"]))
+        except OSError as e:
+            logging.error(f"[Metrics] Failed to start HTTP endpoint: {e}")
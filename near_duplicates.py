@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from memory_store import MemoryStore, get_store
+from utils import clean_text, load_config
+
+# ------------------ Config ------------------
+
+SHINGLE_WORDS = 5  # Words per shingle
+NUM_PERM = 128  # MinHash signature length
+BANDS = 16  # LSH bands of NUM_PERM // BANDS rows; candidates from J ~ 0.7 up
+DEFAULT_THRESHOLD = 0.8  # Estimated Jaccard similarity needed to reuse a result
+SEED = 1
+
+_PRIME = (1 << 31) - 1  # Hash arithmetic stays within uint64
+
+
+def load_dedupe_settings(config: dict = None) -> dict:
+    if config is None:
+        config = load_config()
+    dedupe = config.get("dedupe") or {}
+    return {
+        "enabled": bool(dedupe.get("enabled", False)),
+        "threshold": float(dedupe.get("threshold", DEFAULT_THRESHOLD)),
+    }
+
+
+# ------------------ MinHash ------------------
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> np.ndarray:
+    """
+    Stable 32-bit hashes of every k-word shingle in the text.
+    """
+    words = clean_text(text).lower().split()
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) < k:
+        grams = [" ".join(words)]
+    else:
+        grams = (" ".join(words[i : i + k]) for i in range(len(words) - k + 1))
+    return np.unique(
+        np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+    )
+
+
+class MinHasher:
+    """
+    NUM_PERM universal hash functions h(x) = (a*x + b) mod p; a document's
+    signature is the minimum of each over its shingles.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text)
+        if hashes.size == 0:
+            return None
+        hashes %= _PRIME
+        signature = np.full(len(self.a), _PRIME, dtype=np.uint64)
+        # Chunked so long documents do not build one huge shingles x perms matrix
+        for start in range(0, hashes.size, 4096):
+            values = (np.outer(hashes[start : start + 4096], self.a) + self.b) % _PRIME
+            np.minimum(signature, values.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray, bands: int = BANDS) -> list:
+    """
+    One 63-bit bucket key per band of the signature.
+    """
+    keys = []
+    for band in np.split(signature, bands):
+        digest = hashlib.blake2b(band.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+# ------------------ LSH Index ------------------
+
+
+class DuplicateIndex:
+    """
+    MinHash signatures and LSH band buckets for processed documents, stored
+    in the memory DB together with each document's analysis so a
+    near-duplicate can reuse it without calling the LLM.
+    """
+
+    def __init__(self, store: MemoryStore = None, threshold: float = DEFAULT_THRESHOLD):
+        self.store = store or get_store()
+        self.threshold = threshold
+        self.hasher = MinHasher()
+        self._init_tables()
+
+    # ---- Persistence ----
+
+    def _init_tables(self):
+        with self.store.transaction() as cursor:
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS doc_signatures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+            )
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                doc_id INTEGER NOT NULL
+            )
+            """
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket)"
+            )
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS duplicate_links (
+                filename TEXT NOT NULL,
+                duplicate_of TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                linked_at TEXT NOT NULL
+            )
+            """
+            )
+
+    # ---- Lookup ----
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(text)
+
+    def find(self, signature: np.ndarray) -> dict:
+        """
+        Best stored document whose estimated Jaccard similarity reaches the
+        threshold, as {"filename", "similarity", "analysis"}; else None.
+        """
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+        conn = self.store.connection()
+        candidates = conn.execute(
+            f"""
+        SELECT DISTINCT d.id, d.filename, d.signature, d.analysis
+        FROM lsh_buckets b
+        JOIN doc_signatures d ON d.id = b.doc_id
+        WHERE {" OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(keys))}
+        """,
+            [value for band, key in enumerate(keys) for value in (band, key)],
+        ).fetchall()
+
+        best = None
+        for _, filename, blob, analysis in candidates:
+            other = np.frombuffer(blob, dtype=np.uint32)
+            similarity = float(np.mean(other == signature))
+            if similarity >= self.threshold and (
+                best is None or similarity > best["similarity"]
+            ):
+                best = {
+                    "filename": filename,
+                    "similarity": similarity,
+                    "analysis": json.loads(analysis),
+                }
+        return best
+
+    # ---- Insert ----
+
+    def add(self, filename: str, signature: np.ndarray, analysis: dict):
+        if signature is None:
+            return
+        stored = {k: analysis[k] for k in ("topic", "keywords", "summary")}
+        with self.store.transaction() as cursor:
+            cursor.execute(
+                """
+            INSERT INTO doc_signatures (filename, signature, analysis, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+                (
+                    filename,
+                    signature.astype(np.uint32).tobytes(),
+                    json.dumps(stored),
+                    datetime.now().isoformat(),
+                ),
+            )
+            doc_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                [(band, key, doc_id) for band, key in enumerate(band_keys(signature))],
+            )
+
+    def link(self, filename: str, match: dict):
+        logging.info(
+            f"[Dedupe] {filename} is a near-duplicate of {match['filename']} "
+            f"({match['similarity']:.0%})"
+        )
+        with self.store.transaction() as cursor:
+            cursor.execute(
+                """
+            INSERT INTO duplicate_links (filename, duplicate_of, similarity, linked_at)
+            VALUES (?, ?, ?, ?)
+            """,
+                (
+                    filename,
+                    match["filename"],
+                    match["similarity"],
+                    datetime.now().isoformat(),
+                ),
+            )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_duplicate_index(threshold: float = DEFAULT_THRESHOLD) -> DuplicateIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DuplicateIndex(threshold=threshold)
+    return _index
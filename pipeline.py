@@ -0,0 +1,632 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+from file_handler import (
+    ExtractionPool,
+    extract_text_from_file,
+    extract_texts_parallel,
+    move_file_to_topic_folder,
+    log_to_report,
+    remove_from_report,
+)
+from llm_classifier import classify_with_llm
+from embedding_classifier import classify_embedding
+from classifier_cascade import get_cascade, get_cascade_stats, load_cascade_settings
+from llm_analyzer import analyze_with_llm, analyze_with_shared_prefix
+from rule_based_classifier import classify_rule_based
+from extractor import (
+    extract_keywords_llm,
+    extract_keywords_tfidf,
+    summarize_llm,
+    summarize_rule_based,
+)
+from memory_store import (
+    delete_files_metadata,
+    store_file_metadata,
+    store_many_metadata,
+)
+from metrics import observe_document, observe_stage
+from near_duplicates import get_duplicate_index, load_dedupe_settings
+from utils import load_config
+
+# ------------------ Settings ------------------
+
+
+def load_pipeline_settings(config: dict = None) -> dict:
+    """
+    Read the classifier / extractor switches used by every processing step.
+    """
+    if config is None:
+        config = load_config()
+    classifier = config.get("classifier") or {}
+    extractor = config.get("extractor") or {}
+    pipeline = config.get("pipeline") or {}
+    search = config.get("search") or {}
+    return {
+        "use_llm": classifier.get("use_llm_first", True),
+        "fallback_to_rule": classifier.get("fallback_to_rule", True),
+        "use_embedding": classifier.get("embedding", False),
+        "cascade": load_cascade_settings(config),
+        "dedupe": load_dedupe_settings(config),
+        "extract_llm_mode": extractor.get("llm_mode", True),
+        "fused_analysis": extractor.get("fused_analysis", False),
+        "word_budget": extractor.get("word_budget"),
+        "sample_pages": int(extractor.get("sample_pages", 0)),
+        "extract_workers": int(pipeline.get("extract_workers", 4)),
+        "queue_size": int(pipeline.get("queue_size", 8)),
+        "store_batch_size": max(1, int(pipeline.get("store_batch_size", 32))),
+        "extract_timeout": pipeline.get("extract_timeout", 120),
+        "index_text": search.get("index_text", False),
+    }
+
+
+# ------------------ Analysis Steps ------------------
+
+
+def analyze_text(text: str, settings: dict, record: bool = True) -> dict:
+    """
+    Classify a document and extract its keywords and summary. With
+    `record`, the text is counted in the keyword DF table.
+
+    Returns a dict with "topic", "keywords", "summary", "kv_stats" and
+    "classification" (cascade stage and confidence, if the cascade is on).
+    """
+    topic = keywords = summary = kv_stats = classification = None
+
+    # Step 2a: Cheap classifiers first; the LLM only sees what they escalate
+    if settings["cascade"]["enabled"]:
+        classification = get_cascade(settings["cascade"]).classify(text)
+        if not classification["escalate"]:
+            topic = classification["topic"]
+    elif settings["use_embedding"]:
+        topic = classify_embedding(text)
+
+    # Step 2 + 3: Combined LLM analysis (per-task steps fill gaps)
+    if settings["use_llm"] and settings["extract_llm_mode"]:
+        if settings["fused_analysis"]:
+            analysis = analyze_with_llm(text)
+        else:
+            analysis = analyze_with_shared_prefix(text, classify=topic is None)
+        if analysis:
+            kv_stats = analysis.get("kv_stats")
+            topic = topic or analysis["topic"]
+            keywords = analysis["keywords"]
+            summary = analysis["summary"]
+
+    # Step 2: Classify
+    if topic is None:
+        if settings["use_llm"]:
+            topic = classify_with_llm(text)
+        else:
+            topic = classify_rule_based(text)
+    if settings["use_llm"] and topic == "Misc" and settings["fallback_to_rule"]:
+        topic = classify_rule_based(text)
+
+    # Step 3: Extract keywords and summary
+    if settings["extract_llm_mode"]:
+        if keywords is None:
+            keywords = extract_keywords_llm(text)
+        if summary is None:
+            summary = summarize_llm(text)
+    else:
+        keywords = extract_keywords_tfidf(text, update=record)
+        summary = summarize_rule_based(text)
+
+    return {
+        "topic": topic,
+        "keywords": keywords,
+        "summary": summary,
+        "kv_stats": kv_stats,
+        "classification": classification,
+    }
+
+
+def analyze_document(
+    filename: str, text: str, settings: dict, record: bool = True
+) -> dict:
+    """
+    analyze_text(), but a near-duplicate of an already analyzed document
+    reuses that document's topic, keywords and summary instead.
+
+    The result has a "duplicate_of" entry (filename and similarity, or
+    None). With `record`, the link or the new document's signature is
+    saved to the duplicate index and the text counted for TF-IDF.
+    """
+    index = None
+    if settings["dedupe"]["enabled"]:
+        index = get_duplicate_index(settings["dedupe"]["threshold"])
+        signature = index.signature(text)
+        match = index.find(signature)
+        if match:
+            if record:
+                index.link(filename, match)
+            return {
+                **match["analysis"],
+                "kv_stats": None,
+                "classification": None,
+                "duplicate_of": {
+                    "filename": match["filename"],
+                    "similarity": match["similarity"],
+                },
+            }
+
+    analysis = analyze_text(text, settings, record)
+    analysis["duplicate_of"] = None
+    if index and record:
+        index.add(filename, signature, analysis)
+    return analysis
+
+
+def organize_and_record(
+    file_path: str,
+    analysis: dict,
+    move: bool = True,
+    store: bool = True,
+    body: str = None,
+    rows: list = None,
+) -> str:
+    """
+    Move the file into its topic folder and write it to the DB and report.
+
+    `body` is the extracted text to add to the search index, if any. With
+    `rows`, the DB row is appended there for a later store_many_metadata()
+    instead of being written now.
+
+    Returns the destination path, or None if the file was not moved.
+    """
+    destination = None
+
+    # Step 4: Organize file
+    if move:
+        start = time.perf_counter()
+        destination = move_file_to_topic_folder(file_path, analysis["topic"])
+        observe_stage("move", time.perf_counter() - start, destination is None)
+
+    # Step 5: Store + log
+    if store:
+        row = (
+            os.path.basename(file_path),
+            analysis["topic"],
+            analysis["keywords"],
+            analysis["summary"],
+            body,
+        )
+        if rows is not None:
+            rows.append(row)
+        else:
+            start = time.perf_counter()
+            store_file_metadata(*row)
+            observe_stage("store", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        log_to_report(
+            file_path, analysis["topic"], analysis["keywords"], analysis["summary"]
+        )
+        observe_stage("report", time.perf_counter() - start)
+
+    return destination
+
+
+# ------------------ Single Document ------------------
+
+
+def process_document(
+    file_path: str, settings: dict, move: bool = True, store: bool = True
+) -> dict:
+    """
+    Run every pipeline step for one file and return a result record.
+
+    Exceptions propagate so callers can count the file as failed.
+    """
+    start = time.perf_counter()
+    try:
+        # Step 1: Extract text
+        text = extract_text_from_file(
+            file_path, settings["word_budget"], settings["sample_pages"]
+        )
+        extracted = time.perf_counter()
+        observe_stage("extract", extracted - start)
+
+        analysis = analyze_document(os.path.basename(file_path), text, settings, store)
+        observe_stage("analyze", time.perf_counter() - extracted)
+
+        destination = organize_and_record(
+            file_path,
+            analysis,
+            move=move,
+            store=store,
+            body=text if settings["index_text"] else None,
+        )
+    except Exception:
+        observe_document(time.perf_counter() - start, ok=False)
+        raise
+    observe_document(time.perf_counter() - start)
+
+    return {
+        "file": file_path,
+        "filename": os.path.basename(file_path),
+        "topic": analysis["topic"],
+        "keywords": analysis["keywords"],
+        "summary": analysis["summary"],
+        "kv_stats": analysis["kv_stats"],
+        "classification": analysis["classification"],
+        "duplicate_of": analysis["duplicate_of"],
+        "moved_to": destination,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+# ------------------ Deletion ------------------
+
+
+def delete_documents(file_paths: list) -> int:
+    """
+    Delete organized files from disk, the memory DB and the report.
+
+    DB rows go in one transaction and report rows are tombstoned for
+    background compaction, so large folders delete quickly. Returns the
+    number of files removed from disk.
+    """
+    removed = []
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+            removed.append(os.path.basename(file_path))
+        except OSError as e:
+            logging.error(f"[Delete] Failed to delete {file_path}: {e}")
+
+    delete_files_metadata(removed)
+    remove_from_report(removed)
+    return len(removed)
+
+
+# ------------------ Staged Executor ------------------
+
+_DONE = object()
+STORE_FLUSH_SECONDS = 0.5  # Longest a finished document waits for its DB batch
+
+
+class StageStats:
+    """Counters for one pipeline stage (also fed to the metrics registry)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False):
+        with self._lock:
+            self.items += 1
+            self.busy_seconds += seconds
+            if error:
+                self.errors += 1
+        observe_stage(self.name, seconds, error)
+
+    def snapshot(self, wall_seconds: float) -> dict:
+        with self._lock:
+            return {
+                "items": self.items,
+                "errors": self.errors,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "throughput": self.items / wall_seconds if wall_seconds else 0.0,
+                "utilization": (
+                    self.busy_seconds / wall_seconds if wall_seconds else 0.0
+                ),
+            }
+
+
+class PipelineExecutor:
+    """
+    Run documents through three stages connected by bounded queues:
+
+    extract (process pool) -> analyze (single LLM consumer) -> write (move,
+    log_to_report, memory DB rows batched through store_many_metadata). A
+    full queue blocks the stage in front of it, so extraction never runs far
+    ahead of the LLM.
+    """
+
+    def __init__(
+        self,
+        settings: dict,
+        extract_workers: int = None,
+        queue_size: int = None,
+        move: bool = True,
+        store: bool = True,
+        keep_pool: bool = False,
+    ):
+        self.settings = settings
+        self.extract_workers = max(1, extract_workers or settings["extract_workers"])
+        queue_size = queue_size or settings["queue_size"]
+        self.move = move
+        self.store = store
+        # With keep_pool, extraction workers survive between run() calls
+        # until close(); otherwise each run starts and stops its own
+        self.keep_pool = keep_pool
+        self._pool = None
+
+        self.text_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.result_queue = queue.Queue()
+
+        self.stage_stats = {
+            name: StageStats(name) for name in ("extract", "analyze", "write")
+        }
+        self._stop = threading.Event()
+        self._in_hand = {}  # stage -> item it is working on
+        self._unflushed = []  # Written items waiting for their DB batch
+        self._started_at = None
+        self._pending_files = 0
+
+    # ---- Public API ----
+
+    def run(self, files: list):
+        """
+        Process `files` and yield one result record per file as each
+        finishes the writer stage.
+        """
+        self._started_at = time.perf_counter()
+        self._pending_files = len(files)
+
+        threads = [
+            threading.Thread(target=self._extract_stage, args=(files,), daemon=True),
+            threading.Thread(target=self._analyze_stage, daemon=True),
+        ]
+        threads.append(threading.Thread(target=self._write_stage, daemon=True))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            record = self.result_queue.get()
+            if record is _DONE:
+                break
+            yield record
+
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        """
+        Stop after the documents already in flight.
+        """
+        self._stop.set()
+
+    def close(self):
+        """
+        Shut down the extraction workers kept by `keep_pool`.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def stats(self) -> dict:
+        """
+        Queue depths, per-stage throughput (docs/sec) and utilization, and
+        classifier cascade escalation rates.
+        """
+        wall = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "elapsed": round(wall, 3),
+            "queues": {
+                "extract": self._pending_files,
+                "analyze": self.text_queue.qsize(),
+                "write": self.write_queue.qsize(),
+            },
+            "stages": {
+                name: stats.snapshot(wall) for name, stats in self.stage_stats.items()
+            },
+            "cascade": get_cascade_stats(),
+        }
+
+    # ---- Stages ----
+
+    def _extract_stage(self, files: list):
+        reported = set()
+        try:
+            if self.keep_pool and self._pool is None:
+                self._pool = ExtractionPool(self.extract_workers)
+            results = extract_texts_parallel(
+                files,
+                workers=self.extract_workers,
+                pool=self._pool,
+                timeout=self.settings["extract_timeout"],
+                max_words=self.settings["word_budget"],
+                sample_pages=self.settings["sample_pages"],
+                with_stats=True,
+            )
+            for file_path, text, error, elapsed, extract_stats in results:
+                self._pending_files -= 1
+                item = {
+                    "file": file_path,
+                    "filename": os.path.basename(file_path),
+                    "stage_times": {"extract": elapsed},
+                    "extract_stats": extract_stats,
+                }
+                if error is None:
+                    item["text"] = text
+                else:
+                    item["error"] = error
+                self.stage_stats["extract"].record(elapsed, error is not None)
+                self.text_queue.put(item)
+                reported.add(file_path)
+
+                if self._stop.is_set():
+                    results.close()
+                    break
+        except Exception as e:
+            logging.error(f"[Pipeline] Extract stage failed: {e}")
+            for file_path in files:
+                if file_path not in reported:
+                    self.text_queue.put(
+                        {
+                            "file": file_path,
+                            "filename": os.path.basename(file_path),
+                            "stage_times": {"extract": 0.0},
+                            "extract_stats": None,
+                            "error": str(e),
+                        }
+                    )
+        finally:
+            # Always, so a failed stage cannot leave the next one waiting
+            self.text_queue.put(_DONE)
+
+    def _analyze_stage(self):
+        try:
+            self._analyze_items()
+        except Exception as e:
+            logging.error(f"[Pipeline] Analyze stage failed: {e}")
+            self._fail_remaining(
+                "analyze", self.text_queue, self.write_queue.put, str(e)
+            )
+        finally:
+            self.write_queue.put(_DONE)
+
+    def _analyze_items(self):
+        while True:
+            item = self.text_queue.get()
+            if item is _DONE:
+                break
+            self._in_hand["analyze"] = item
+            if "error" in item:
+                self.write_queue.put(self._in_hand.pop("analyze"))
+                continue
+
+            text = item.pop("text")
+            if self.settings["index_text"]:
+                item["body"] = text
+
+            start = time.perf_counter()
+            try:
+                item["analysis"] = analyze_document(
+                    item["filename"], text, self.settings, record=self.store
+                )
+            except Exception as e:
+                item["error"] = str(e)
+            elapsed = time.perf_counter() - start
+            item["stage_times"]["analyze"] = elapsed
+            self.stage_stats["analyze"].record(elapsed, "error" in item)
+            self.write_queue.put(self._in_hand.pop("analyze"))
+
+    def _write_stage(self):
+        try:
+            self._write_items()
+        except Exception as e:
+            logging.error(f"[Pipeline] Write stage failed: {e}")
+            for item in self._unflushed:
+                item.setdefault("error", str(e))
+                self.result_queue.put(self._to_record(item))
+            self._fail_remaining(
+                "write",
+                self.write_queue,
+                lambda item: self.result_queue.put(self._to_record(item)),
+                str(e),
+            )
+        finally:
+            self.result_queue.put(_DONE)
+
+    def _write_items(self):
+        batch_size = self.settings["store_batch_size"]
+        rows = []  # DB rows of self._unflushed, written in one transaction
+        flush_at = None
+        while True:
+            try:
+                timeout = max(0.0, flush_at - time.perf_counter()) if flush_at else None
+                item = self.write_queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_writes(rows)
+                flush_at = None
+                continue
+            if item is _DONE:
+                break
+            self._in_hand["write"] = item
+
+            if "error" not in item:
+                start = time.perf_counter()
+                try:
+                    item["moved_to"] = organize_and_record(
+                        item["file"],
+                        item["analysis"],
+                        move=self.move,
+                        store=self.store,
+                        body=item.get("body"),
+                        rows=rows,
+                    )
+                except Exception as e:
+                    item["error"] = str(e)
+                elapsed = time.perf_counter() - start
+                item["stage_times"]["write"] = elapsed
+            self._unflushed.append(self._in_hand.pop("write"))
+            flush_at = flush_at or time.perf_counter() + STORE_FLUSH_SECONDS
+
+            # Full batches under load; a trickle is flushed after a short wait
+            if len(self._unflushed) >= batch_size or time.perf_counter() >= flush_at:
+                self._flush_writes(rows)
+                flush_at = None
+        self._flush_writes(rows)
+
+    def _flush_writes(self, rows: list):
+        """
+        Store the buffered DB rows in one transaction, then emit the records.
+
+        The files were already moved and reported, so a failed transaction
+        does not turn them into errors: they stay "ok" with a `warning`, and
+        callers leave them out of the scan manifest so they are retried.
+        """
+        if rows:
+            start = time.perf_counter()
+            stored = store_many_metadata(rows)
+            share = (time.perf_counter() - start) / len(rows)
+            for _ in rows:
+                observe_stage("store", share)
+            for item in self._unflushed:
+                if "error" not in item:
+                    item["stage_times"]["write"] += share
+                    if not stored:
+                        item["warning"] = "Not saved to the memory DB"
+            rows.clear()
+
+        for item in self._unflushed:
+            if "write" in item["stage_times"]:
+                self.stage_stats["write"].record(
+                    item["stage_times"]["write"], "error" in item
+                )
+            self.result_queue.put(self._to_record(item))
+        self._unflushed.clear()
+
+    def _fail_remaining(self, stage: str, source: queue.Queue, forward, error: str):
+        """
+        Pass the item `stage` failed on, and everything still queued for
+        it, on as errors, so no file is dropped and the stage upstream
+        never blocks on a full queue.
+        """
+        item = self._in_hand.pop(stage, None)
+        while True:
+            if item is None:
+                item = source.get()
+            if item is _DONE:
+                return
+            item.pop("text", None)
+            item.setdefault("error", error)
+            forward(item)
+            item = None
+
+    def _to_record(self, item: dict) -> dict:
+        record = {"file": item["file"], "filename": item["filename"]}
+        if "error" in item:
+            record["status"] = "error"
+            record["error"] = item["error"]
+        else:
+            record.update(item["analysis"])
+            record["moved_to"] = item.get("moved_to")
+            record["status"] = "ok"
+            if "warning" in item:
+                record["warning"] = item["warning"]
+        record["extract_stats"] = item.get("extract_stats")
+        record["stage_times"] = item["stage_times"]
+        record["elapsed"] = sum(item["stage_times"].values())
+        observe_document(record["elapsed"], record["status"] == "ok")
+        return record
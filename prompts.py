@@ -0,0 +1,57 @@
+from utils import clean_text, truncate_text
+
+# --------------- Shared Document Prefix ------------------
+
+# Every task prompt starts with the same document block so the model's KV
+# cache for it can be reused across the classify / keyword / summary calls.
+# Keep the prefix first and identical across templates.
+
+PREFIX_MAX_WORDS = 500
+
+# Bump whenever a template below changes so cached LLM results are not reused.
+PROMPT_VERSION = "2"
+
+DOCUMENT_PREFIX = """
+Document:
+\"\"\"
+{text}
+\"\"\"
+"""
+
+
+def prepare_document_text(document_text: str) -> str:
+    """
+    Clean and truncate text the same way for every prompt sharing the prefix.
+    """
+    return truncate_text(clean_text(document_text), max_words=PREFIX_MAX_WORDS)
+
+
+# --------------- Task Suffixes ------------------
+
+CLASSIFY_SUFFIX = """
+You are a smart document classifier. Classify the document above into one of the following categories:
+{categories}
+
+Respond only with the topic name, nothing else.
+"""
+
+KEYWORD_SUFFIX = """
+Extract the 5 most important keywords from the document above.
+
+Return them as a comma-separated list only.
+"""
+
+SUMMARY_SUFFIX = """
+Summarize the document above in 2–3 sentences:
+"""
+
+ANALYSIS_SUFFIX = """
+You are a smart document analyst. Describe the document above.
+
+Respond only with a JSON object with exactly these fields:
+"topic": one of {categories}
+"keywords": a list of the {top_n} most important keywords
+"summary": a 2–3 sentence summary of the document
+
+JSON:
+"""
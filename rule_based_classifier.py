@@ -1,5 +1,8 @@
-from utils import clean_text
+from utils import clean_text, load_config
 import logging
+import re
+
+import numpy as np
 
 # ------------------ Rule Definitions ------------------
 
@@ -60,6 +63,106 @@ TOPIC_KEYWORDS = {
 
 DEFAULT_TOPIC = "Misc"
 
+# ------------------ Compiled Matcher ------------------
+
+
+def _whole_word(pattern: str) -> str:
+    """
+    Match `pattern` only when not inside a longer word. Unlike \\b this
+    also works for keywords that start or end with punctuation ("c++").
+    """
+    return rf"(?<!\w)(?:{pattern})(?!\w)"
+
+
+class RuleMatcher:
+    """
+    Whole-word keyword matcher compiled once from a {topic: [keywords]} map.
+
+    All keywords go into a single regex alternation (longest first) so each
+    document is scanned once. A topic's score is the number of its distinct
+    keywords found, as before, but "ai" no longer matches inside "said".
+    """
+
+    def __init__(self, topic_keywords: dict):
+        self.topics = list(topic_keywords)
+        topic_keywords = {
+            topic: [kw.strip().lower() for kw in kws if kw and kw.strip()]
+            for topic, kws in topic_keywords.items()
+        }
+        self.keywords = sorted(
+            {kw for kws in topic_keywords.values() for kw in kws},
+            key=len,
+            reverse=True,
+        )
+        self.keyword_index = {kw: i for i, kw in enumerate(self.keywords)}
+        # No keywords: an empty alternation would match everywhere
+        self.pattern = (
+            re.compile(_whole_word("|".join(map(re.escape, self.keywords))))
+            if self.keywords
+            else None
+        )
+
+        # keyword x topic membership, so scores are one matrix product
+        self.membership = np.zeros((len(self.keywords), len(self.topics)), dtype=int)
+        for t, kws in enumerate(topic_keywords.values()):
+            for kw in kws:
+                self.membership[self.keyword_index[kw], t] = 1
+
+        # A match on "lecture notes" also counts "lecture" and "notes"
+        self.implied = {
+            kw: [
+                self.keyword_index[other]
+                for other in self.keywords
+                if re.search(_whole_word(re.escape(other)), kw)
+            ]
+            for kw in self.keywords
+        }
+
+    def matched_keywords(self, text: str) -> set:
+        found = set()
+        if self.pattern is None:
+            return found
+        for kw in self.pattern.findall(clean_text(text).lower()):
+            found.update(self.implied[kw])
+        return found
+
+    def score(self, text: str) -> dict:
+        """
+        Per-topic scores for one document.
+        """
+        scores = self.score_batch([text])[0]
+        return dict(zip(self.topics, scores.tolist()))
+
+    def score_batch(self, texts: list) -> np.ndarray:
+        """
+        Score many documents at once; returns a docs x topics matrix.
+        """
+        hits = np.zeros((len(texts), len(self.keywords)), dtype=int)
+        for row, text in enumerate(texts):
+            hits[row, list(self.matched_keywords(text))] = 1
+        return hits @ self.membership
+
+
+def load_topic_keywords() -> dict:
+    """
+    Keyword rules from config.yaml's `rules` section, else TOPIC_KEYWORDS.
+    """
+    rules = load_config().get("rules")
+    if isinstance(rules, dict) and rules:
+        return {topic: list(keywords or []) for topic, keywords in rules.items()}
+    return TOPIC_KEYWORDS
+
+
+_matcher = None
+
+
+def get_rule_matcher() -> RuleMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = RuleMatcher(load_topic_keywords())
+    return _matcher
+
+
 # ------------------ Classification Logic ------------------
 
 
@@ -68,16 +171,10 @@ def classify_rule_based(text: str) -> str:
     Uses keyword-matching to classify a document into a topic.
     """
     try:
-        text = clean_text(text).lower()
-        scores = {}
-
-        for topic, keywords in TOPIC_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text)
-            if score > 0:
-                scores[topic] = score
+        scores = score_rule_based(text)
+        best_topic = max(scores, key=scores.get) if scores else None
 
-        if scores:
-            best_topic = max(scores, key=scores.get)
+        if best_topic and scores[best_topic] > 0:
             logging.info(f"[Rule-Based] Classified as: {best_topic}")
             return best_topic
         else:
@@ -87,3 +184,18 @@ def classify_rule_based(text: str) -> str:
     except Exception as e:
         logging.error(f"[Rule-Based] Failed: {e}")
         return DEFAULT_TOPIC
+
+
+def score_rule_based(text: str) -> dict:
+    """
+    Returns {topic: score} for every rule topic.
+    """
+    return get_rule_matcher().score(text)
+
+
+def score_rule_based_batch(texts: list) -> tuple:
+    """
+    Returns (scores, topics): a docs x topics score matrix and its column labels.
+    """
+    matcher = get_rule_matcher()
+    return matcher.score_batch(texts), matcher.topics
@@ -0,0 +1,206 @@
+"""
+Persisted manifest of scanned files, so rescans only yield what changed.
+
+Every processed file is recorded with its size, mtime, inode, content hash
+and status. A rescan is a plain os.scandir stat pass; a known file is only
+read (to hash it) when its size, mtime or inode differ from the manifest, and
+it is only reported as changed when the hash differs too. New files, and
+files whose last run failed, are always reported.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime
+
+from memory_store import MemoryStore, get_store
+from utils import is_supported_file
+
+HASH_CHUNK_SIZE = 1 << 20
+
+# ------------------ Helpers ------------------
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_supported_files(directory: str):
+    """
+    Yield (path, os.stat_result) for every supported file under `directory`.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError as e:
+            logging.warning(f"[Manifest] Cannot scan directory: {e}")
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and is_supported_file(entry.name):
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue  # Removed while scanning
+
+
+# ------------------ Manifest ------------------
+
+
+class ScanManifest:
+    """
+    (path, size, mtime_ns, inode, content_hash) for every processed file.
+
+    `scan()` does not write the manifest; callers record files with
+    `mark_processed()` once the pipeline is done with them, so a crash
+    mid-batch just means those files come up again.
+    """
+
+    def __init__(self, store: MemoryStore = None):
+        self.store = store or get_store()
+        # path -> (size, mtime_ns, inode, hash) computed by scan(), reused by
+        # mark_processed() while the file is unchanged
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self._init_tables()
+
+    # ---- Persistence ----
+
+    def _init_tables(self):
+        with self.store.transaction() as cursor:
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS scan_manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                scanned_at TEXT NOT NULL
+            )
+            """
+            )
+
+    def _rows_under(self, directory: str) -> dict:
+        # Range over the primary key instead of LIKE so the index is used
+        prefix = os.path.join(directory, "")
+        cursor = self.store.connection().execute(
+            """
+        SELECT path, size, mtime_ns, inode, content_hash, status
+        FROM scan_manifest
+        WHERE path >= ? AND path < ?
+        """,
+            (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)),
+        )
+        return {row[0]: row[1:] for row in cursor}
+
+    # ---- Scanning ----
+
+    def scan(self, directories: list) -> list:
+        """
+        Return the supported files under `directories` that are new, failed
+        last time, or whose content changed since they were last processed.
+
+        Files that were touched but hash the same get their new stat
+        signature saved, so they cost nothing on the next scan. Rows for
+        files that no longer exist are dropped.
+        """
+        changed = []
+        refreshed = []
+        vanished = []
+        for directory in directories:
+            directory = os.path.abspath(directory)
+            known = self._rows_under(directory)
+            for path, stat in iter_supported_files(directory):
+                row = known.pop(path, None)
+                if row is None or row[4] != "ok":
+                    changed.append(path)  # Hashed once, when marked processed
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+                if row[:3] == signature:
+                    continue
+                try:
+                    content_hash = file_hash(path)
+                except OSError:
+                    continue
+                if row[3] == content_hash:
+                    refreshed.append((*signature, path))
+                else:
+                    changed.append(path)
+                    with self._lock:
+                        self._hashes[path] = (*signature, content_hash)
+            vanished.extend((path,) for path in known)
+
+        with self.store.transaction() as cursor:
+            cursor.executemany(
+                "UPDATE scan_manifest SET size = ?, mtime_ns = ?, inode = ? WHERE path = ?",
+                refreshed,
+            )
+            cursor.executemany("DELETE FROM scan_manifest WHERE path = ?", vanished)
+
+        logging.info(
+            f"[Manifest] {len(changed)} new or changed, {len(refreshed)} touched, "
+            f"{len(vanished)} gone"
+        )
+        return changed
+
+    def mark_processed(self, results: list):
+        """
+        Record (path, status) pairs. Only "ok" files are skipped by later
+        scans; failed ones come up again. Paths that no longer exist (moved
+        into a topic folder) are dropped from the manifest instead.
+        """
+        now = datetime.now().isoformat()
+        rows, gone = [], []
+        for path, status in results:
+            path = os.path.abspath(path)
+            with self._lock:
+                cached = self._hashes.pop(path, None)
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+                if cached is not None and cached[:3] == signature:
+                    content_hash = cached[3]
+                else:
+                    content_hash = file_hash(path)
+            except OSError:
+                gone.append((path,))
+                continue
+            rows.append((path, *signature, content_hash, status, now))
+
+        with self.store.transaction() as cursor:
+            cursor.executemany(
+                """
+            INSERT INTO scan_manifest
+                (path, size, mtime_ns, inode, content_hash, status, scanned_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                size = excluded.size, mtime_ns = excluded.mtime_ns,
+                inode = excluded.inode, content_hash = excluded.content_hash,
+                status = excluded.status, scanned_at = excluded.scanned_at
+            """,
+                rows,
+            )
+            cursor.executemany("DELETE FROM scan_manifest WHERE path = ?", gone)
+
+
+# ------------------ Shared Instance ------------------
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_scan_manifest() -> ScanManifest:
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = ScanManifest()
+    return _manifest
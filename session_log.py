@@ -0,0 +1,131 @@
+import glob
+import json
+import logging
+import os
+import threading
+from array import array
+from collections import deque
+from datetime import datetime
+
+# ------------------ Config ------------------
+
+SESSION_DIR = "logs"
+PAGE_SIZE = 200  # Entries per page when browsing the log
+KEEP_SESSIONS = 20  # Older session logs are deleted when a new one starts
+
+# ------------------ Session Log ------------------
+
+
+class SessionLog:
+    """
+    Append-only JSONL record of everything shown in the results pane
+    ({"seq", "time", "tag", "message"} per line), so the pane itself can
+    stay small.
+
+    Only the byte offset of each page's first entry is kept in memory
+    (8 bytes per PAGE_SIZE entries); pages are read back from disk and
+    searches stream the file, so memory stays flat however long the
+    session runs.
+    """
+
+    def __init__(self, path: str = None, page_size: int = PAGE_SIZE):
+        if path is None:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(SESSION_DIR, f"session_{stamp}.jsonl")
+        self.path = path
+        self.page_size = page_size
+        self._count = 0
+        self._page_offsets = array("q")
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+        self._offset = self._file.tell()
+
+    def append(self, tag: str, message: str, timestamp: str = None):
+        entry = {
+            "seq": self._count,
+            "time": timestamp or datetime.now().strftime("%H:%M:%S"),
+            "tag": tag,
+            "message": message,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._count % self.page_size == 0:
+                self._page_offsets.append(self._offset)
+            self._file.write(line)
+            self._offset += len(line)
+            self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_offsets)
+
+    # ---- Reading ----
+
+    def page(self, number: int) -> list:
+        """
+        Entries of one page (0 = oldest), read from disk.
+        """
+        with self._lock:
+            if not 0 <= number < len(self._page_offsets):
+                return []
+            self._file.flush()
+            offset = self._page_offsets[number]
+
+        entries = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                entries.append(json.loads(line))
+                if len(entries) >= self.page_size:
+                    break
+        return entries
+
+    def search(self, text: str, limit: int = 200) -> list:
+        """
+        The most recent `limit` entries whose message contains `text`
+        (case-insensitive), oldest first.
+        """
+        needle = text.lower()
+        matches = deque(maxlen=limit)
+        with self._lock:
+            self._file.flush()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    # Cheap prefilter on the raw line before decoding JSON
+                    if needle in line.lower():
+                        entry = json.loads(line)
+                        if needle in entry["message"].lower():
+                            matches.append(entry)
+        except Exception as e:
+            logging.error(f"[Session] Search failed: {e}")
+        return list(matches)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def prune_sessions(directory: str = SESSION_DIR, keep: int = KEEP_SESSIONS) -> int:
+    """
+    Delete all but the newest `keep` session logs. Returns how many went.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "session_*.jsonl")))
+    removed = 0
+    for path in paths[: max(0, len(paths) - keep)]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            logging.error(f"[Session] Failed to delete {path}: {e}")
+    return removed
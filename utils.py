@@ -1,4 +1,3 @@
-import os
 import re
 from datetime import datetime
 
@@ -52,3 +51,30 @@ def format_topic_folder_name(topic: str) -> str:
 
 def current_timestamp() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ------------------ Config Loader ------------------
+
+CONFIG_PATH = "config.yaml"
+
+
+def set_config_path(path: str):
+    """
+    Point every later load_config() call at a different config file.
+    """
+    global CONFIG_PATH
+    CONFIG_PATH = path
+
+
+def load_config(path: str = None) -> dict:
+    """
+    Read config.yaml and return it as a dict (empty if the file is missing).
+    """
+    import yaml
+
+    path = path or CONFIG_PATH
+    try:
+        with open(path, "r") as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
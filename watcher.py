@@ -0,0 +1,282 @@
+"""
+Watch-folder daemon: process documents as they land in drop folders.
+
+New and modified files are picked up through inotify when the optional
+`inotify_simple` package is installed, otherwise by polling. A file is only
+processed once its size and mtime have stopped changing for
+`debounce_seconds`, and ready files are handed to the pipeline in batches.
+Processed files are recorded in the scan manifest, so a restart only picks
+up files that arrived or changed while it was down.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from pipeline import PipelineExecutor, load_pipeline_settings
+from scan_manifest import ScanManifest, get_scan_manifest, iter_supported_files
+from utils import is_supported_file, load_config
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # Optional; fall back to polling
+    INotify = None
+
+# ------------------ Settings ------------------
+
+
+def load_watch_settings(config: dict = None) -> dict:
+    if config is None:
+        config = load_config()
+    watch = config.get("watch") or {}
+    return {
+        "directories": list(watch.get("directories") or []),
+        "debounce_seconds": float(watch.get("debounce_seconds", 2.0)),
+        "batch_size": int(watch.get("batch_size", 50)),
+        "batch_window": float(watch.get("batch_window", 2.0)),
+        "poll_interval": float(watch.get("poll_interval", 5.0)),
+    }
+
+
+# ------------------ Change Sources ------------------
+
+
+class PollingSource:
+    """
+    Find new or modified files by re-scanning the directories.
+    """
+
+    overflowed = False  # Scans cannot miss changes
+
+    def __init__(self, directories: list, interval: float):
+        self.directories = directories
+        self.interval = interval
+        self._seen = self._snapshot()
+        self._next_scan = time.monotonic() + interval
+
+    def _snapshot(self) -> dict:
+        return {
+            path: (stat.st_size, stat.st_mtime_ns)
+            for directory in self.directories
+            for path, stat in iter_supported_files(directory)
+        }
+
+    def changes(self, timeout: float) -> list:
+        wait = self._next_scan - time.monotonic()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            if time.monotonic() < self._next_scan:
+                return []
+        self._next_scan = time.monotonic() + self.interval
+
+        current = self._snapshot()
+        changed = [p for p, sig in current.items() if self._seen.get(p) != sig]
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifySource:
+    """
+    Receive file events from the kernel instead of scanning.
+
+    New subdirectories are watched as they appear (and scanned once, since
+    files can land in them before the watch is added). If the kernel's event
+    queue overflows, `overflowed` is set so the watcher can rescan.
+    """
+
+    MASK = (
+        flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY
+        if INotify
+        else 0
+    )
+
+    def __init__(self, directories: list):
+        self._inotify = INotify()
+        self._paths = {}
+        self.directories = directories
+        self.overflowed = False
+        for directory in directories:
+            self._watch_tree(directory)
+
+    def _watch_tree(self, directory: str) -> list:
+        found = []
+        for root, dirs, files in os.walk(directory):
+            try:
+                wd = self._inotify.add_watch(root, self.MASK)
+                self._paths[wd] = root
+            except OSError as e:
+                logging.warning(f"[Watch] Cannot watch {root}: {e}")
+            found.extend(os.path.join(root, f) for f in files if is_supported_file(f))
+        return found
+
+    def changes(self, timeout: float) -> list:
+        changed = []
+        for event in self._inotify.read(timeout=int(timeout * 1000)):
+            if event.mask & flags.Q_OVERFLOW:
+                # Events were dropped; directories created meanwhile may be
+                # unwatched too (re-adding an existing watch is harmless)
+                logging.warning("[Watch] inotify event queue overflowed")
+                self.overflowed = True
+                for directory in self.directories:
+                    self._watch_tree(directory)
+                continue
+            root = self._paths.get(event.wd)
+            if root is None or not event.name:
+                continue
+            path = os.path.join(root, event.name)
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    changed.extend(self._watch_tree(path))
+            elif is_supported_file(event.name):
+                changed.append(path)
+        return changed
+
+    def close(self):
+        self._inotify.close()
+
+
+# ------------------ Watcher ------------------
+
+
+class FolderWatcher:
+    """
+    Debounce file changes and feed them to the pipeline in batches.
+    """
+
+    def __init__(
+        self,
+        directories: list,
+        pipeline_settings: dict = None,
+        watch_settings: dict = None,
+        move: bool = True,
+        manifest: ScanManifest = None,
+        on_record=None,
+    ):
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.pipeline_settings = pipeline_settings or load_pipeline_settings()
+        self.settings = watch_settings or load_watch_settings()
+        self.move = move
+        self.manifest = manifest or get_scan_manifest()
+        self.on_record = on_record
+
+        self._pending = {}  # path -> (size, mtime_ns, last change)
+        self._ready = {}  # path -> (size, mtime_ns), insertion ordered
+        self._ready_since = None
+        self._stop = threading.Event()
+        # One executor (and extraction pool) for every batch
+        self._executor = None
+
+    # ---- Public API ----
+
+    def run(self):
+        """
+        Watch until stop() is called. Blocks the calling thread.
+        """
+        # Start watching before the catch-up scan so nothing slips between
+        if INotify is not None:
+            source = InotifySource(self.directories)
+            backend = "inotify"
+        else:
+            source = PollingSource(self.directories, self.settings["poll_interval"])
+            backend = "polling"
+        logging.info(f"[Watch] Watching {len(self.directories)} dirs ({backend})")
+
+        try:
+            self._catch_up()
+            while not self._stop.is_set():
+                for path in source.changes(timeout=0.5):
+                    self._touch(path)
+                if source.overflowed:
+                    source.overflowed = False
+                    self._rescan()
+                self._settle()
+                if self._batch_due():
+                    self._process_batch()
+            if self._ready:
+                self._process_batch()
+        finally:
+            source.close()
+            if self._executor is not None:
+                self._executor.close()
+                self._executor = None
+
+    def stop(self):
+        self._stop.set()
+
+    # ---- Debounce / Batching ----
+
+    def _catch_up(self):
+        """
+        Queue files that are new or changed since they were last processed.
+        """
+        for path in self.manifest.scan(self.directories):
+            self._touch(path)
+        logging.info(f"[Watch] {len(self._pending)} files changed since last run")
+
+    def _rescan(self):
+        """
+        Recover from lost events: queue changed files not already queued.
+        """
+        missed = [
+            path
+            for path in self.manifest.scan(self.directories)
+            if path not in self._pending and path not in self._ready
+        ]
+        for path in missed:
+            self._touch(path)
+        logging.info(f"[Watch] Rescan after overflow found {len(missed)} files")
+
+    def _touch(self, path: str):
+        self._pending[path] = (None, None, time.monotonic())
+        self._ready.pop(path, None)
+
+    def _settle(self):
+        """
+        Move files whose size and mtime held still for the debounce period
+        to the ready batch.
+        """
+        now = time.monotonic()
+        for path, (size, mtime_ns, changed_at) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]  # Deleted or moved away
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if signature != (size, mtime_ns):
+                self._pending[path] = (*signature, now)
+            elif now - changed_at >= self.settings["debounce_seconds"]:
+                del self._pending[path]
+                self._ready[path] = signature
+                if self._ready_since is None:
+                    self._ready_since = now
+
+    def _batch_due(self) -> bool:
+        if not self._ready:
+            return False
+        if len(self._ready) >= self.settings["batch_size"]:
+            return True
+        return time.monotonic() - self._ready_since >= self.settings["batch_window"]
+
+    def _process_batch(self):
+        batch = dict(list(self._ready.items())[: self.settings["batch_size"]])
+        for path in batch:
+            del self._ready[path]
+        self._ready_since = time.monotonic() if self._ready else None
+
+        logging.info(f"[Watch] Processing batch of {len(batch)} files")
+        if self._executor is None:
+            self._executor = PipelineExecutor(
+                self.pipeline_settings, move=self.move, keep_pool=True
+            )
+        processed = []
+        for record in self._executor.run(list(batch)):
+            if "warning" not in record:
+                processed.append((record["file"], record["status"]))
+            if self.on_record:
+                self.on_record(record)
+        self.manifest.mark_processed(processed)